@@ -249,7 +249,18 @@ class SimpleMP3Processor:
     def _show_final_summary(self, results: List[Dict], total: int):
         """Muestra resumen final."""
         elapsed = time.time() - self.start_time
-        success_count = sum(1 for r in results if r.get('success', False))
+        
+        # Una sola pasada: contar exitosos y guardar solo los ejemplos que se muestran
+        success_count = 0
+        success_files = []
+        error_files = []
+        for r in results:
+            if r.get('success', False):
+                success_count += 1
+                if len(success_files) < 5 and r.get('info', {}).get('has_metadata'):
+                    success_files.append(r)
+            if len(error_files) < 3 and r.get('error'):
+                error_files.append(r)
         
         logger.info(f"\n🏁 RESUMEN FINAL")
         logger.info(f"=" * 40)
@@ -261,18 +272,16 @@ class SimpleMP3Processor:
         logger.info(f"⚡ Promedio: {elapsed/len(results):.1f}s por archivo")
         
         # Mostrar algunos exitosos
-        success_files = [r for r in results if r.get('success') and r.get('info', {}).get('has_metadata')]
         if success_files:
             logger.info(f"\n🎵 ARCHIVOS CON METADATA (primeros 5):")
-            for result in success_files[:5]:
+            for result in success_files:
                 info = result['info']
                 logger.info(f"   🎤 {info['artist']} - {info['title']}")
         
         # Mostrar algunos errores
-        error_files = [r for r in results if r.get('error')]
         if error_files:
             logger.info(f"\n❌ ERRORES (primeros 3):")
-            for result in error_files[:3]:
+            for result in error_files:
                 logger.info(f"   💥 {result['filename']}: {result['error']}")
 
 def main():
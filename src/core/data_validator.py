@@ -27,6 +27,8 @@ class DataValidator:
     FILENAME_INVALID_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
     ARTIST_TITLE_PATTERN = re.compile(r'^[a-zA-Z0-9\s\-_\(\)\[\]\.\,\'\&\+\!\?]+$')
     SAFE_STRING_PATTERN = re.compile(r'^[a-zA-Z0-9\s\-_\.\,\'\(\)]+$')
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    ALNUM_PATTERN = re.compile(r'[a-zA-Z0-9]')
     
     # Caracteres peligrosos para diferentes contextos
     DANGEROUS_FILENAME_CHARS = set('<>:"/\\|?*')
@@ -88,7 +90,7 @@ class DataValidator:
         filename = cls.FILENAME_INVALID_CHARS.sub('_', filename)
         
         # Eliminar espacios múltiples
-        filename = re.sub(r'\s+', ' ', filename).strip()
+        filename = cls.WHITESPACE_PATTERN.sub(' ', filename).strip()
         
         # Eliminar puntos al final (problemático en Windows)
         filename = filename.rstrip('.')
@@ -120,7 +122,7 @@ class DataValidator:
             warnings.append(f"{field_name} fue sanitizado")
             
         # Verificar que no sea solo espacios o caracteres especiales
-        if not sanitized.strip() or not re.search(r'[a-zA-Z0-9]', sanitized):
+        if not sanitized.strip() or not cls.ALNUM_PATTERN.search(sanitized):
             errors.append(f"{field_name} no contiene caracteres válidos")
             
         return ValidationResult(
@@ -140,7 +142,7 @@ class DataValidator:
         text = ''.join(char for char in text if not unicodedata.category(char).startswith('C'))
         
         # Limpiar espacios múltiples
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = cls.WHITESPACE_PATTERN.sub(' ', text).strip()
         
         return text
         
@@ -291,7 +293,7 @@ class DataValidator:
         """Sanitiza un género musical."""
         # Normalizar y limpiar
         genre = unicodedata.normalize('NFKD', genre)
-        genre = re.sub(r'\s+', ' ', genre).strip()
+        genre = cls.WHITESPACE_PATTERN.sub(' ', genre).strip()
         
         # Convertir a título apropiado
         genre = genre.title()
@@ -382,20 +384,20 @@ class DataValidator:
 class SecurityValidator:
     """Validador especializado en aspectos de seguridad."""
     
+    # Patrones de validación (compilados una sola vez). Los peligros de shell van
+    # en una sola alternancia: una pasada sobre el texto en lugar de tres
+    SHELL_DANGEROUS_PATTERN = re.compile(
+        r'[;&|`$()[\]{}*?<>]'  # Caracteres shell peligrosos
+        r'|\.\./|\.\.\\"'      # Path traversal
+        r'|^\s*[-/]'           # Parámetros que parecen flags
+    )
+    CACHE_KEY_PATTERN = re.compile(r'^[a-zA-Z0-9_\-:.]+$')
+    CACHE_KEY_INVALID_CHARS = re.compile(r'[^a-zA-Z0-9_\-:.]')
+    
     @classmethod
     def is_safe_for_shell(cls, text: str) -> bool:
         """Verifica si un texto es seguro para usar en comandos shell."""
-        dangerous_patterns = [
-            r'[;&|`$()[\]{}*?<>]',  # Caracteres shell peligrosos
-            r'\.\./|\.\.\\"',        # Path traversal
-            r'^\s*[-/]',            # Parámetros que parecen flags
-        ]
-        
-        for pattern in dangerous_patterns:
-            if re.search(pattern, text):
-                return False
-                
-        return True
+        return cls.SHELL_DANGEROUS_PATTERN.search(text) is None
         
     @classmethod
     def sanitize_for_shell(cls, text: str) -> str:
@@ -419,11 +421,11 @@ class SecurityValidator:
             errors.append(f"Clave de cache demasiado larga: {len(key)}")
             
         # Verificar caracteres seguros
-        if not re.match(r'^[a-zA-Z0-9_\-:.]+$', key):
+        if not cls.CACHE_KEY_PATTERN.match(key):
             errors.append("Clave de cache contiene caracteres no permitidos")
             
         # Sanitizar
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-:.]', '_', key)
+        sanitized = cls.CACHE_KEY_INVALID_CHARS.sub('_', key)
         
         return ValidationResult(
             is_valid=len(errors) == 0,
@@ -151,11 +151,17 @@ class ErrorHandler:
             
         # Errores recientes (última hora)
         recent_cutoff = time.time() - 3600
-        recent_errors = [ctx for ctx in self.error_history if ctx.timestamp > recent_cutoff]
+        recent_errors = 0
+        # El historial está en orden cronológico: basta recorrerlo desde el final
+        # hasta el primer error anterior al corte
+        for ctx in reversed(self.error_history):
+            if ctx.timestamp <= recent_cutoff:
+                break
+            recent_errors += 1
         
         return {
             "total_errors": total_errors,
-            "recent_errors": len(recent_errors),
+            "recent_errors": recent_errors,
             "severity_distribution": severity_counts,
             "component_stats": self.component_stats.copy(),
             "most_common_errors": self._get_most_common_errors()
@@ -3,6 +3,7 @@ from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import shutil
 import os
+import uuid
 from datetime import datetime
 from mutagen.easyid3 import EasyID3
 from mutagen.id3 import ID3, TCON
@@ -49,6 +50,12 @@ KNOWN_ARTISTS = {
 # Acrónimos que deben permanecer en mayúsculas en el formateo Title Case
 KNOWN_ACRONYMS_TITLE_CASE = {"YMCA", "DJ", "UK", "USA", "EP", "LP", "MTV", "KC"}
 
+# Directorios que no se recorren al buscar MP3 (repositorios, entornos y metadatos de volúmenes)
+EXCLUDED_DIR_NAMES = frozenset({
+    ".git", "__pycache__", ".venv", "venv", "node_modules", ".pytest_cache",
+    ".Spotlight-V100", ".Trashes", ".fseventsd", ".TemporaryItems",
+})
+
 def _format_text_to_spaced_title_case(text: str) -> str:
     """Convierte una cadena de texto a Title Case con espacios, manejando acrónimos."""
     if not text:
@@ -258,6 +265,50 @@ def _to_pascal_case(text: str) -> str:
 
     return "".join(processed_words)
 
+def find_mp3_files(folder_path: str) -> List[str]:
+    """Busca recursivamente los archivos .mp3 de una carpeta.
+
+    Los directorios de EXCLUDED_DIR_NAMES se descartan al llegar a ellos, sin
+    recorrer su contenido, y no se siguen enlaces simbólicos a directorios.
+
+    Args:
+        folder_path: Carpeta raíz de la búsqueda
+
+    Returns:
+        List[str]: Rutas de los archivos encontrados
+    """
+    found = []
+    stack = [folder_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in EXCLUDED_DIR_NAMES:
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith(".mp3"):
+                        found.append(entry.path)
+        except OSError as e:
+            logger.warning(f"No se pudo leer el directorio: {e}")
+    return found
+
+def path_key(path: str) -> str:
+    """Clave normalizada de una ruta para comprobar duplicados.
+
+    Las rutas llegan tanto del diálogo de carpetas como de arrastrar y soltar,
+    con separadores y segmentos redundantes distintos según la plataforma; se
+    normalizan una sola vez para que la comparación sea directa. Solo se
+    unifican los separadores de la plataforma (os.sep/os.altsep): en POSIX la
+    barra invertida es un carácter válido del nombre y se conserva.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        str: Ruta normalizada según las reglas de la plataforma
+    """
+    return os.path.normcase(os.path.normpath(path))
+
 class Mp3FileHandler:
     """Handles MP3 file operations and tag management."""
     
@@ -321,7 +372,10 @@ class Mp3FileHandler:
         if not self.backup_dir:
             return None
         original = Path(file_path)
-        backup_file_name = f"{original.stem}_backup_{datetime.now().strftime('%Y%m%d%H%M%S%f')}{original.suffix}"
+        # La marca de tiempo sola puede repetirse entre hilos que respaldan archivos
+        # con el mismo nombre en directorios distintos; el uuid hace el nombre único
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        backup_file_name = f"{original.stem}_backup_{timestamp}_{uuid.uuid4().hex}{original.suffix}"
         return self.backup_dir / backup_file_name
             
     def _create_backup(self, file_path: str) -> bool:
@@ -642,12 +696,10 @@ class Mp3FileHandler:
                 # Try to preserve as much as possible while staying within limits
                 new_filename_stem = new_filename_stem.encode('utf-8')[:max_length].decode('utf-8', 'ignore')
             
-            new_filename = new_filename_stem + file_extension
-            new_path = original_path_obj.parent / new_filename
-            
-            # Handle name conflicts
-            counter = 1
-            while new_path.exists() and new_path != original_path_obj:
+            def candidate_path(counter: int) -> Path:
+                """Ruta destino; a partir de 1 lleva el sufijo " (n)" de conflicto."""
+                if counter == 0:
+                    return original_path_obj.parent / (new_filename_stem + file_extension)
                 base_stem = new_filename_stem
                 counter_str = f" ({counter})"
                 
@@ -656,16 +708,36 @@ class Mp3FileHandler:
                 if len(base_stem.encode('utf-8')) > max_stem_length:
                     base_stem = base_stem.encode('utf-8')[:max_stem_length].decode('utf-8', 'ignore')
                     
-                new_filename = base_stem + counter_str + file_extension
-                new_path = original_path_obj.parent / new_filename
+                return original_path_obj.parent / (base_stem + counter_str + file_extension)
+            
+            # Handle name conflicts
+            counter = 0
+            new_path = candidate_path(counter)
+            while new_path.exists() and new_path != original_path_obj:
                 counter += 1
+                new_path = candidate_path(counter)
 
             result["new_path"] = str(new_path) # Guardar la ruta potencial incluso si no se renombra
 
             # Renombrar el archivo FÍSICAMENTE solo si se solicita y es necesario
             if perform_os_rename_action and original_path_obj.resolve() != new_path.resolve():
                 try:
-                    original_path_obj.rename(new_path)
+                    # Reservar el destino de forma atómica (O_EXCL): si otro hilo o proceso lo
+                    # ocupó desde la comprobación anterior se prueba el siguiente nombre, y el
+                    # rename solo reemplaza el marcador propio, nunca un archivo ajeno
+                    while True:
+                        try:
+                            os.close(os.open(new_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                            break
+                        except FileExistsError:
+                            counter += 1
+                            new_path = candidate_path(counter)
+                    result["new_path"] = str(new_path)
+                    try:
+                        os.replace(original_path_obj, new_path)
+                    except OSError:
+                        new_path.unlink()
+                        raise
                     logger.info(f"Archivo '{original_path_obj.name}' renombrado a '{new_path.name}'")
                     result["message"] = f"Metadatos actualizados y archivo renombrado a '{new_path.name}'."
                     # 'success' ya es True por la escritura de tags
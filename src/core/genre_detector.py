@@ -1,4 +1,5 @@
 """Genre detection and analysis module."""
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from pathlib import Path
 import json
@@ -73,6 +74,11 @@ class GenreDetector:
             file_path: Ruta al archivo MP3
             chunk_size: Tamaño del chunk para lectura en bytes (default: 8KB)
         """
+        file_info = self.file_handler.get_file_info(file_path, chunk_size=chunk_size)
+        return self._analyze_file_info(file_info)
+        
+    def _analyze_file_info(self, file_info: Optional[Dict]) -> Dict:
+        """Detect genres from the file info already read for an MP3 file."""
         result = {
             "file_info": {},
             "metadata": {},
@@ -82,8 +88,6 @@ class GenreDetector:
             "api_results": {}  # Store individual API results
         }
         
-        # Get file info usando chunks
-        file_info = self.file_handler.get_file_info(file_path, chunk_size=chunk_size)
         if not file_info:
             result["error"] = "No se pudo leer la información del archivo"
             return result
@@ -176,20 +180,49 @@ class GenreDetector:
             
         return result
         
-    def analyze_files(self, file_paths: List[str], chunk_size: int = 8192) -> Dict[str, Dict]:
+    def analyze_files(self, file_paths: List[str], chunk_size: int = 8192,
+                      max_workers: int = 8) -> Dict[str, Dict]:
         """Analyze multiple files.
         
+        Los archivos se agrupan por (artista, título) para consultar las APIs
+        una sola vez por pista; las pistas distintas se consultan en paralelo.
+        
         Args:
             file_paths: Lista de rutas de archivos MP3
             chunk_size: Tamaño del chunk para lectura en bytes (default: 8KB)
+            max_workers: Número máximo de pistas consultadas en paralelo
         """
         results = {}
-        for path in file_paths:
+        file_infos = {}
+        groups: Dict[tuple, List[str]] = {}
+        for path in dict.fromkeys(file_paths):
             try:
-                results[path] = self.analyze_file(path, chunk_size=chunk_size)
+                file_info = self.file_handler.get_file_info(path, chunk_size=chunk_size)
             except Exception as e:
                 results[path] = {"error": f"Error al analizar {path}: {str(e)}"}
-        return results
+                continue
+            file_infos[path] = file_info
+            artist = file_info.get('artist') if file_info else None
+            title = file_info.get('title') if file_info else None
+            key = (artist, title) if artist and title else (path,)
+            groups.setdefault(key, []).append(path)
+            
+        def analyze(path: str) -> Dict:
+            try:
+                return self._analyze_file_info(file_infos[path])
+            except Exception as e:
+                return {"error": f"Error al analizar {path}: {str(e)}"}
+                
+        leaders = [paths[0] for paths in groups.values()]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results.update(zip(leaders, executor.map(analyze, leaders)))
+            
+        # Los duplicados reutilizan la caché de géneros que dejó la primera pista del grupo
+        for paths in groups.values():
+            for path in paths[1:]:
+                results[path] = analyze(path)
+                
+        return {path: results[path] for path in file_paths}
 
 def get_fallback_genres(artist: str, title: str) -> Dict[str, float]:
     """
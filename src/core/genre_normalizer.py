@@ -110,6 +110,12 @@ class GenreNormalizer:
     # Add special cases to valid genres
     VALID_GENRES.update(set(SPECIAL_CASES.values()))
 
+    # Inverse of GENRE_HIERARCHY: child genre -> parent genre
+    PARENT_GENRES = {}
+    for parent, children in GENRE_HIERARCHY.items():
+        for child in children:
+            PARENT_GENRES.setdefault(child, parent)
+
     # Separadores comunes para géneros múltiples
     MULTI_GENRE_SEPARATORS = [
         ';',      # "R&B; Pop; Rock"
@@ -182,11 +188,8 @@ class GenreNormalizer:
 
         # Try fuzzy matching if enabled
         if fuzzy_match:
-            # First check if it's a parent genre
-            if normalized in cls.GENRE_HIERARCHY:
-                return normalized, 1.0
-                
-            # Then try exact substring matches with parent genres first
+            # Parent genres are already part of VALID_GENRES, checked above.
+            # Try exact substring matches with parent genres first
             for valid_genre in cls.GENRE_HIERARCHY.keys():
                 if lower_genre in valid_genre.lower() or valid_genre.lower() in lower_genre:
                     return valid_genre, 0.95
@@ -231,18 +234,21 @@ class GenreNormalizer:
         """
         best_score = 0
         best_match = genre
+        # Pasar a minúsculas una sola vez, no en cada comparación
+        genre_lower = genre.lower()
+        genre_first = genre_lower.split()[0]
 
         for candidate in candidates:
+            candidate_lower = candidate.lower()
             # Calculate base similarity score
-            score = SequenceMatcher(None, genre.lower(), candidate.lower()).ratio()
+            score = SequenceMatcher(None, genre_lower, candidate_lower).ratio()
             
             # Apply bonuses for partial matches
-            if genre.lower() in candidate.lower() or candidate.lower() in genre.lower():
+            if genre_lower in candidate_lower or candidate_lower in genre_lower:
                 score += 0.1
                 
             # Bonus for matching first word
-            genre_first = genre.lower().split()[0]
-            candidate_first = candidate.lower().split()[0]
+            candidate_first = candidate_lower.split()[0]
             if genre_first == candidate_first:
                 score += 0.1
                 
@@ -265,10 +271,7 @@ class GenreNormalizer:
             Parent genre name or None if no parent found
         """
         normalized, _ = cls.normalize(genre)
-        for parent, children in cls.GENRE_HIERARCHY.items():
-            if normalized in children:
-                return parent
-        return None
+        return cls.PARENT_GENRES.get(normalized)
 
     @classmethod
     def normalize_list(cls, genres: List[str]) -> List[Tuple[str, float]]:
@@ -383,9 +386,10 @@ class GenreNormalizer:
         # Proteger géneros conocidos que contienen separadores
         protected_replacements = {}
         temp_string = cleaned
+        cleaned_lower = cleaned.lower()
         
         for i, protected_genre in enumerate(cls.PROTECTED_MULTI_GENRES):
-            if protected_genre.lower() in cleaned.lower():
+            if protected_genre.lower() in cleaned_lower:
                 placeholder = f"__PROTECTED_{i}__"
                 # Buscar coincidencias case-insensitive
                 pattern = re.escape(protected_genre)
@@ -713,10 +717,11 @@ class GenreNormalizer:
         penalty = 0.0
         
         # Penalizar combinaciones muy dispares
-        if 'classical' in [g.lower() for g in genres] and 'death metal' in [g.lower() for g in genres]:
+        genres_lower = [g.lower() for g in genres]
+        if 'classical' in genres_lower and 'death metal' in genres_lower:
             penalty += 0.4
         
-        if 'ambient' in [g.lower() for g in genres] and any('punk' in g.lower() for g in genres):
+        if 'ambient' in genres_lower and any('punk' in g for g in genres_lower):
             penalty += 0.3
         
         final_score = min(1.0, max(0.0, base_score + compatibility_bonus - penalty))
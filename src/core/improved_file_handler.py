@@ -37,6 +37,19 @@ FILENAME_PATTERNS = [
     r'^(?P<artist>.+?)\s+-\s+(?P<title>.+?)(?:\s+[\(\[]\d+(?:[\s\.]?\w+)?[\)\]])$',
 ]
 
+# Patrones precompilados: se compilan una sola vez al importar el módulo
+_COMPILED_FILENAME_PATTERNS = [re.compile(p, re.IGNORECASE) for p in FILENAME_PATTERNS]
+_TRACK_NUMBER_RE = re.compile(r'^(\d+[\s\._-]+)')
+_ALBUM_INFO_RE = re.compile(r'\s+\[(?:álbum|album|compilation|recopilación|OST).*?\]', re.IGNORECASE)
+_ARTIST_THE_SUFFIX_RE = re.compile(r',\s+The$')
+_ARTIST_NOISE_RE = re.compile(r'\(Official\)|\(Official Artist\)|\(VEVO\)', re.IGNORECASE)
+_FEAT_RE = re.compile(r'feat\.?(?=\s)', re.IGNORECASE)
+_FT_RE = re.compile(r'ft\.?(?=\s)', re.IGNORECASE)
+_TITLE_NOISE_RE = re.compile(r'\(Official (?:Video|Audio|Music Video|Lyric Video)\)|\(VEVO\)|\(Audio\)', re.IGNORECASE)
+_REMIX_RE = re.compile(r'(?<=\s)rmx(?=[\s\)\]])|\bremx\b', re.IGNORECASE)
+_EDIT_RE = re.compile(r'(?<=\s)ed(?:it)?(?=[\s\)\]])|\bedit\b', re.IGNORECASE)
+_EXTENDED_RE = re.compile(r'(?<=\s)ext(?:ended)?(?=[\s\)\]])|\bextended\b', re.IGNORECASE)
+
 def extract_artist_title_improved(filename: str, 
                                  fallback_artist: str = "", 
                                  fallback_title: str = "") -> Tuple[str, str]:
@@ -51,21 +64,21 @@ def extract_artist_title_improved(filename: str,
         Tupla con (artista, título)
     """
     # Eliminar números de track al principio si existen
-    cleaned_filename = re.sub(r'^(\d+[\s\._-]+)', '', filename)
+    cleaned_filename = _TRACK_NUMBER_RE.sub('', filename)
     
     # Eliminar información de álbum entre corchetes si existe
-    cleaned_filename = re.sub(r'\s+\[(?:álbum|album|compilation|recopilación|OST).*?\]', '', cleaned_filename, flags=re.IGNORECASE)
+    cleaned_filename = _ALBUM_INFO_RE.sub('', cleaned_filename)
     
     # Intentar reconocer patrones comunes
-    for pattern in FILENAME_PATTERNS:
-        match = re.match(pattern, cleaned_filename, re.IGNORECASE)
+    for pattern in _COMPILED_FILENAME_PATTERNS:
+        match = pattern.match(cleaned_filename)
         if match:
             artist = match.group('artist').strip()
             title = match.group('title').strip()
             
             # Validación básica: asegurarse de que ambos tengan contenido
             if artist and title:
-                logger.debug(f"Patrón detectado: {pattern}")
+                logger.debug(f"Patrón detectado: {pattern.pattern}")
                 logger.debug(f"Extracción exitosa: Artist='{artist}', Title='{title}'")
                 return artist, title
     
@@ -104,14 +117,14 @@ def post_process_artist(artist: str) -> str:
         return "Unknown Artist"
     
     # Eliminar prefijos como "The" si está al final entre paréntesis
-    artist = re.sub(r',\s+The$', '', artist)
+    artist = _ARTIST_THE_SUFFIX_RE.sub('', artist)
     
     # Eliminar información irrelevante
-    artist = re.sub(r'\(Official\)|\(Official Artist\)|\(VEVO\)', '', artist, flags=re.IGNORECASE).strip()
+    artist = _ARTIST_NOISE_RE.sub('', artist).strip()
     
     # Normalizar feat/ft./featuring
-    artist = re.sub(r'feat\.?(?=\s)', 'feat.', artist, flags=re.IGNORECASE)
-    artist = re.sub(r'ft\.?(?=\s)', 'ft.', artist, flags=re.IGNORECASE)
+    artist = _FEAT_RE.sub('feat.', artist)
+    artist = _FT_RE.sub('ft.', artist)
     
     # Capitalizar nombres propios básicos (no incluye reglas complejas para todas las excepciones)
     return ' '.join(word.capitalize() if word.lower() not in ['feat.', 'ft.', 'and', 'or', 'the', 'of', 'by', 'with'] 
@@ -123,12 +136,12 @@ def post_process_title(title: str) -> str:
         return "Unknown Title"
     
     # Eliminar información irrelevante
-    title = re.sub(r'\(Official (?:Video|Audio|Music Video|Lyric Video)\)|\(VEVO\)|\(Audio\)', '', title, flags=re.IGNORECASE).strip()
+    title = _TITLE_NOISE_RE.sub('', title).strip()
     
     # Normalizar remix/version/edit designations
-    title = re.sub(r'(?<=\s)rmx(?=[\s\)\]])|\bremx\b', 'Remix', title, flags=re.IGNORECASE)
-    title = re.sub(r'(?<=\s)ed(?:it)?(?=[\s\)\]])|\bedit\b', 'Edit', title, flags=re.IGNORECASE)
-    title = re.sub(r'(?<=\s)ext(?:ended)?(?=[\s\)\]])|\bextended\b', 'Extended', title, flags=re.IGNORECASE)
+    title = _REMIX_RE.sub('Remix', title)
+    title = _EDIT_RE.sub('Edit', title)
+    title = _EXTENDED_RE.sub('Extended', title)
     
     # Capitalizar primera letra de cada palabra excepto conectores
     return ' '.join(word.capitalize() if word.lower() not in ['a', 'an', 'the', 'in', 'on', 'at', 'by', 'for', 'with', 'and', 'but', 'or'] or i == 0
@@ -18,7 +18,7 @@ Requiere:
 import requests # Mantener por si alguna API lo usa directamente, aunque ahora debería ser vía music_apis.py
 import logging
 import re
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import threading # Para la paralelización futura
 from queue import Queue # Para la paralelización futura
 
@@ -135,7 +135,7 @@ def query_all_sources(artist: str, title: str, email_for_musicbrainz: str = "use
     all_candidate_genres: List[str] = []
     candidate_years: Dict[str, str] = {}
     candidate_albums: Dict[str, str] = {}
-    processed_sources_log: List[str] = [] # Log de estado de cada API
+    processed_sources_log: List[Tuple[str, str, str]] = [] # (api, estado, detalle) de cada API
 
     while not results_queue.empty():
         result_item = results_queue.get()
@@ -144,7 +144,7 @@ def query_all_sources(artist: str, title: str, email_for_musicbrainz: str = "use
         status = result_item["status"]
 
         if status == "ok" and info:
-            processed_sources_log.append(f"{api_name}:ok")
+            processed_sources_log.append((api_name, "ok", ""))
             if info.get("genres"):
                 valid_genres = [g for g in info["genres"] if isinstance(g, str)]
                 all_candidate_genres.extend(valid_genres)
@@ -156,10 +156,10 @@ def query_all_sources(artist: str, title: str, email_for_musicbrainz: str = "use
                 candidate_albums[api_name] = str(info["album"]).strip()
                 logger.debug(f"{api_name} album: {info['album']}")
         elif status == "error":
-            processed_sources_log.append(f"{api_name}:error - {result_item.get('error_message', 'Unknown error')}")
+            processed_sources_log.append((api_name, "error", result_item.get('error_message', 'Unknown error')))
             logger.error(f"Error reportado por {api_name} thread: {result_item.get('error_message')}")
         else: # status ok pero no info, o status desconocido
-            processed_sources_log.append(f"{api_name}:no_data_or_unexpected_status")
+            processed_sources_log.append((api_name, "no_data_or_unexpected_status", ""))
             logger.warning(f"{api_name} no devolvió datos o tuvo un estado inesperado.")
 
     # --- Fusión de Metadatos ---
@@ -229,9 +229,10 @@ def query_all_sources(artist: str, title: str, email_for_musicbrainz: str = "use
         # Usar el processed_sources_log para determinar las fuentes que contribuyeron con géneros
         # Esta lógica podría mejorarse si queremos saber exactamente qué API contribuyó qué género
         # Por ahora, si la API tuvo éxito (status 'ok') y devolvió *algún* dato, asumimos que pudo haber contribuido.
-        if any("Last.fm:ok" in s for s in processed_sources_log): genre_src_flags.append("L")
-        if any("Discogs:ok" in s for s in processed_sources_log): genre_src_flags.append("D")
-        if any("MusicBrainz:ok" in s for s in processed_sources_log): genre_src_flags.append("M")
+        ok_sources = {name for name, status, _ in processed_sources_log if status == "ok"}
+        if "Last.fm" in ok_sources: genre_src_flags.append("L")
+        if "Discogs" in ok_sources: genre_src_flags.append("D")
+        if "MusicBrainz" in ok_sources: genre_src_flags.append("M")
         if genre_src_flags: source_summary_parts.append(f"G:{'+'.join(genre_src_flags)}")
         
     final_result["source"] = sorted(list(set(source_summary_parts)))
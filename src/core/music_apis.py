@@ -6,7 +6,7 @@ import requests
 import musicbrainzngs
 import pylast
 from bs4 import BeautifulSoup
-import time
+from time import perf_counter
 import logging
 import re
 import os
@@ -71,14 +71,14 @@ class MusicAPI(ABC):
             limit_key: Specific rate limit key, or None for default
         """
         key = f"{self.api_name}_{limit_key or 'default'}"
-        start_time = time.time()
+        start_time = perf_counter()
         
         # Try to acquire token
         if not _rate_limiter.acquire(key, wait=True):
             _metrics.record_api_call(
                 self.api_name,
                 success=False,
-                latency=time.time() - start_time,
+                latency=perf_counter() - start_time,
                 rate_limited=True
             )
             raise RuntimeError(f"Rate limit exceeded for {self.api_name}")
@@ -94,7 +94,7 @@ class MusicAPI(ABC):
         _metrics.record_api_call(
             self.api_name,
             success=success,
-            latency=time.time() - start_time,
+            latency=perf_counter() - start_time,
             rate_limited=rate_limited
         )
 
@@ -102,6 +102,10 @@ class MusicAPI(ABC):
         """Get current metrics for this API."""
         return _metrics.get_metrics(self.api_name)
 
+    def reset_metrics(self) -> None:
+        """Reset recorded metrics for this API."""
+        _metrics.reset_metrics(self.api_name)
+
     @abstractmethod
     def get_track_info(self, artist: str, track: str) -> Mapping[str, Any]:
         """Get track information (genres, year, album).
@@ -228,7 +232,7 @@ class MusicBrainzAPI(MusicAPI):
             logger.debug(f"Cache hit for MusicBrainz info: {artist} - {track}")
             return cached
 
-        start_time = time.time()
+        start_time = perf_counter()
         genres: List[str] = []
         year: Optional[str] = None
         album: Optional[str] = None
@@ -417,7 +421,7 @@ class LastFmAPI(MusicAPI):
             logger.debug(f"Cache hit for Last.fm info: {artist} - {track}")
             return cached
 
-        start_time = time.time()
+        start_time = perf_counter()
 
         if not self.network:
             logger.warning("LastFMNetwork not initialized. Skipping Last.fm query.")
@@ -575,7 +579,7 @@ class DiscogsAPI(MusicAPI):
             logger.warning("Discogs API token not configured. Skipping Discogs query.")
             return None
             
-        start_time = time.time()
+        start_time = perf_counter()
         
         # Determine rate limit key based on endpoint
         limit_key = "lookup" if any(x in endpoint for x in ["masters/", "releases/"]) else "search"
@@ -637,7 +641,7 @@ class DiscogsAPI(MusicAPI):
             logger.debug(f"Cache hit for Discogs info: {artist} - {track}")
             return cached
 
-        start_time = time.time()
+        start_time = perf_counter()
 
         # Search for release
         search_params = {
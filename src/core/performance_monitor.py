@@ -253,7 +253,12 @@ class PerformanceMonitor:
             
             # Calcular promedios de los últimos 10 minutos
             recent_cutoff = time.time() - 600  # 10 minutos
-            recent_metrics = [m for m in self.system_metrics_history if m.timestamp > recent_cutoff]
+            recent_metrics = []
+            # Historial en orden cronológico: parar en la primera muestra antigua
+            for m in reversed(self.system_metrics_history):
+                if m.timestamp <= recent_cutoff:
+                    break
+                recent_metrics.append(m)
             
             if recent_metrics:
                 avg_cpu = statistics.mean([m.cpu_percent for m in recent_metrics])
@@ -1,90 +1,148 @@
 """Persistent disk-based cache implementation with advanced features."""
+import hashlib
+import heapq
+import itertools
 import json
-import os
+import sqlite3
+import threading
 import time
+import weakref
 import zlib
 from threading import Lock
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import logging
 from pathlib import Path
 from collections import OrderedDict
 import sys
-import re
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3 es opcional; sin él se usa hashlib.blake2b
+    blake3 = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard es opcional; sin él se usa lz4 o zlib
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # lz4 es opcional; sin él se comprime con zlib
+    lz4 = None
 
 logger = logging.getLogger(__name__)
 
-def sanitize_cache_filename(filename: str) -> str:
-    """
-    Sanitiza nombres de archivo para cache, eliminando caracteres problemáticos.
-    
-    Args:
-        filename: Nombre de archivo original
-        
-    Returns:
-        Nombre de archivo sanitizado para sistema de archivos
-    """
-    # Reemplazar caracteres problemáticos
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    
-    # Eliminar espacios dobles y caracteres de control
-    sanitized = re.sub(r'\s+', ' ', sanitized).strip()
-    
-    # Limitar longitud para evitar problemas de sistema de archivos
-    if len(sanitized) > 200:
-        sanitized = sanitized[:200] + '_truncated'
-    
-    return sanitized
-
-class CacheEntry:
-    """Representa una entrada en el caché con metadatos."""
-    
-    def __init__(self, value: Any, expires: float, size: int, data_type: str):
-        self.value = value
-        self.expires = expires
-        self.size = size
-        self.data_type = data_type
-        self.last_accessed = time.time()
-
-    def to_dict(self) -> dict:
-        """Convierte la entrada a diccionario para serialización."""
-        return {
-            "value": self.value,
-            "expires": self.expires,
-            "size": self.size,
-            "data_type": self.data_type,
-            "last_accessed": self.last_accessed
-        }
+# Nombre del archivo de base de datos dentro de cache_dir
+DB_FILENAME = "cache.sqlite3"
 
-    @classmethod
-    def from_dict(cls, data: dict) -> 'CacheEntry':
-        """Crea una entrada desde un diccionario deserializado."""
-        entry = cls(
-            data["value"],
-            data["expires"],
-            data["size"],
-            data["data_type"]
-        )
-        entry.last_accessed = data.get("last_accessed", time.time())
-        return entry
+# Número de shards (potencia de 2): cada uno tiene su propio lock e índice LRU
+_NUM_SHARDS = 16
+
+# Políticas de expulsión soportadas
+EVICTION_POLICIES = ("lru", "counter")
+
+# Al saturarse un contador de accesos se dividen todos (de todos los shards) a la mitad
+_COUNTER_LIMIT = 2 ** 31
+
+# Tamaño en bytes de las claves hasheadas de get_b/set_b
+KEY_HASH_SIZE = 16
+
+# Etiquetas de tipo para reconstruir el valor original al leer
+_TYPE_STR = 0
+_TYPE_BYTES = 1
+_TYPE_JSON = 2
+
+# Prefijo de los bloques LZ4; los bloques sin él son zlib (formato anterior)
+_LZ4_MAGIC = b"LZ4\x00"
+
+# Número mágico propio de los frames zstd (no se añade prefijo)
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Nivel por defecto de cada códec. En un caché dominado por lecturas importa más
+# la velocidad que el ratio:
+#   zstd 3  -> ~400 MB/s comprimiendo, ratio cercano a zlib 6, descompresión ~1 GB/s
+#   lz4 0   -> modo rápido (acceleration=1), ratio menor, descompresión la más rápida
+#   zlib 6  -> respaldo sin dependencias; ~20-30 MB/s comprimiendo
+_DEFAULT_COMPRESSION_LEVELS = {"zstd": 3, "lz4": 0, "zlib": 6}
+
+# Rango de niveles aceptados por cada códec
+_COMPRESSION_LEVEL_RANGES = {"zstd": (1, 22), "lz4": (0, 16), "zlib": (0, 9)}
+
+# Ahorro mínimo para guardar la forma comprimida; por debajo no compensa descomprimir
+_MIN_COMPRESSION_SAVINGS = 0.10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY NOT NULL,
+    expires REAL NOT NULL,
+    data_type TEXT NOT NULL,
+    value_type INTEGER NOT NULL,
+    compressed INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL
+)
+"""
+
+# Índice TTL: la limpieza recorre solo el rango de entradas expiradas
+_EXPIRES_INDEX = "CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)"
+
+def _janitor_loop(cache_ref: "weakref.ref[PersistentCache]", stop_event: threading.Event,
+                  interval: float) -> None:
+    """Purga periódicamente las entradas expiradas mientras el caché exista."""
+    while not stop_event.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.cleanup()
+        del cache  # No retener el caché entre ciclos
+
+class _Connection(sqlite3.Connection):
+    """Conexión SQLite que admite referencias débiles."""
 
 class PersistentCache:
-    """Caché persistente en disco con TTL, límites de tamaño y optimizaciones."""
-    
+    """Caché persistente en disco con TTL, límites de tamaño y optimizaciones.
+
+    Todas las entradas se guardan en una única base de datos SQLite (modo WAL)
+    dentro de ``cache_dir``, en lugar de un archivo JSON por entrada.
+
+    Las claves se reparten en shards con lock propio, de modo que operaciones
+    sobre claves distintas no se bloquean entre sí. Cada hilo usa su propia
+    conexión SQLite.
+
+    Un hilo "janitor" en segundo plano elimina en bloque las entradas
+    expiradas cada ``cleanup_interval`` segundos; ``get()`` solo comprueba la
+    expiración de la clave pedida.
+
+    Con ``eviction="counter"`` cada lectura solo incrementa un contador de la
+    entrada (sin reordenar el índice) y se expulsa la entrada con menos
+    accesos; a igualdad de accesos, la más antigua.
+    """
+
     def __init__(self, cache_dir: str,
                  default_ttl: int = 3600,
                  max_size_bytes: int = 100 * 1024 * 1024,  # 100MB default
                  compression_threshold: int = 1024,  # 1KB
                  ttl_policy: Dict[str, int] = None,
-                 cleanup_interval: int = 300):  # 5 min default
+                 cleanup_interval: int = 300,  # 5 min default
+                 *,
+                 compression_level: Optional[int] = None,
+                 eviction: str = "lru",
+                 clock: Callable[[], float] = time.time):
         """Inicializa el caché persistente.
-        
+
         Args:
-            cache_dir: Directorio para almacenar archivos de caché
+            cache_dir: Directorio donde se crea la base de datos del caché
             default_ttl: TTL predeterminado en segundos (default: 1 hora)
             max_size_bytes: Tamaño máximo del caché en bytes
             compression_threshold: Tamaño mínimo para comprimir en bytes
             ttl_policy: Diccionario de TTLs por tipo de dato {"type": seconds}
-            cleanup_interval: Intervalo en segundos para limpiar entradas expiradas
+            cleanup_interval: Intervalo en segundos entre pasadas del janitor
+            compression_level: Nivel del códec disponible (zstd, si no lz4, si no
+                zlib). Por defecto zstd 3, lz4 0 (acceleration=1) o zlib 6
+            eviction: Política de expulsión, "lru" (default) o "counter"
+            clock: Función que devuelve el tiempo actual en segundos. Debe ser
+                de reloj de pared (default: time.time) porque las expiraciones
+                se guardan en disco y sobreviven a reinicios
         """
         # Validar parámetros
         if default_ttl <= 0:
@@ -95,26 +153,39 @@ class PersistentCache:
             raise ValueError("compression_threshold debe ser positivo")
         if cleanup_interval <= 0:
             raise ValueError("cleanup_interval debe ser positivo")
-        """Inicializa el caché persistente.
-        
-        Args:
-            cache_dir: Directorio para almacenar archivos de caché
-            default_ttl: TTL predeterminado en segundos (default: 1 hora)
-            max_size_bytes: Tamaño máximo del caché en bytes
-            compression_threshold: Tamaño mínimo para comprimir en bytes
-            ttl_policy: Diccionario de TTLs por tipo de dato {"type": seconds}
-        """
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction debe ser uno de {EVICTION_POLICIES}")
         self._cache_dir = Path(cache_dir)
+        self._db_path = self._cache_dir / DB_FILENAME
         self._default_ttl = default_ttl
         self._max_size_bytes = max_size_bytes
         self._compression_threshold = compression_threshold
+        self._codec = "zstd" if zstandard is not None else "lz4" if lz4 is not None else "zlib"
+        self._compression_level = (
+            _DEFAULT_COMPRESSION_LEVELS[self._codec] if compression_level is None else compression_level
+        )
+        low, high = _COMPRESSION_LEVEL_RANGES[self._codec]
+        if not low <= self._compression_level <= high:
+            raise ValueError(f"compression_level para {self._codec} debe estar entre {low} y {high}")
         self._ttl_policy = ttl_policy or {}
-        self._lock = Lock()
+        self._eviction = eviction
+        self._clock = clock
+        self._shard_locks = [Lock() for _ in range(_NUM_SHARDS)]
+        # Por shard: key -> (tamaño, tick, accesos); en modo LRU, de menos a más reciente
+        self._shards: List["OrderedDict[str, Tuple[int, int, int]]"] = [
+            OrderedDict() for _ in range(_NUM_SHARDS)
+        ]
+        self._tick = itertools.count()
+        self._halve_pending = False  # Algún contador se saturó; ver _halve_counters()
+        self._size_lock = Lock()  # Protege _current_size y _stats
+        self._local = threading.local()
+        # Conexiones abiertas por cualquier hilo, para que close() las cierre todas.
+        # Referencias débiles: la de un hilo que termina se libera con él
+        self._connections: "weakref.WeakSet[_Connection]" = weakref.WeakSet()
+        self._connections_lock = Lock()
         self._current_size = 0
-        self._lru_cache = OrderedDict()  # key -> tamaño
         self._cleanup_interval = cleanup_interval
-        self._last_cleanup = time.time()
-        
+
         # Estadísticas mejoradas
         self._stats = {
             "hits": 0,
@@ -124,320 +195,618 @@ class PersistentCache:
             "current_size": 0,
             "entries": 0
         }
-        
+
         # Crear directorio de caché si no existe
         self._cache_dir.mkdir(parents=True, exist_ok=True)
-        
+
         # Inicializar caché
+        self._local.db = self._connect()
         self._init_cache()
-        
-    def _init_cache(self) -> None:
-        """Inicializa el caché cargando entradas existentes y limpiando expiradas."""
-        self._current_size = 0
-        self._lru_cache.clear()
-        
-        # Cargar entradas existentes
-        for cache_file in self._cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    entry = json.load(f)
-                    entry_obj = CacheEntry.from_dict(entry)
-                    
-                # Verificar expiración
-                if entry_obj.expires <= time.time():
-                    cache_file.unlink()
-                    self._stats["evictions"] += 1
-                    continue
-                    
-                key = cache_file.stem
-                self._lru_cache[key] = entry_obj.size
-                self._current_size += entry_obj.size
-                
-            except (json.JSONDecodeError, KeyError, OSError) as e:
-                logger.warning(f"Error cargando archivo de caché {cache_file}: {e}")
+
+        # Janitor: solo guarda una referencia débil para no mantener vivo el caché
+        self._stop_janitor = threading.Event()
+        weakref.finalize(self, self._stop_janitor.set)
+        self._janitor = threading.Thread(
+            target=_janitor_loop,
+            args=(weakref.ref(self), self._stop_janitor, cleanup_interval),
+            name=f"PersistentCacheJanitor-{self._cache_dir.name}",
+            daemon=True
+        )
+        self._janitor.start()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """Conexión SQLite del hilo actual."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._open_db()
+        return db
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre la base de datos del caché, recreándola si está corrupta."""
+        try:
+            return self._open_db()
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"Base de datos de caché corrupta {self._db_path}: {e}")
+            for suffix in ("", "-wal", "-shm"):
                 try:
-                    cache_file.unlink()
+                    Path(f"{self._db_path}{suffix}").unlink()
                 except OSError:
                     pass
-        
+            return self._open_db()
+
+    def _open_db(self) -> sqlite3.Connection:
+        """Abre la conexión SQLite y crea el esquema si no existe."""
+        # Autocommit: cada sentencia es su propia transacción. Cada conexión la usa
+        # un solo hilo, pero close() puede cerrarla desde otro
+        db = sqlite3.connect(self._db_path, isolation_level=None, check_same_thread=False,
+                             factory=_Connection)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(_SCHEMA)
+            db.execute(_EXPIRES_INDEX)
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        with self._connections_lock:
+            self._connections.add(db)
+        return db
+
+    def _init_cache(self) -> None:
+        """Inicializa el caché cargando entradas existentes y limpiando expiradas."""
+        self._current_size = 0
+        for index in self._shards:
+            index.clear()
+
+        # Eliminar entradas expiradas
+        cursor = self._db.execute("DELETE FROM entries WHERE expires <= ?", (self._clock(),))
+        self._stats["evictions"] += cursor.rowcount
+
+        # Cargar índice de entradas existentes (rowid refleja el orden de escritura)
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY rowid"):
+            self._shards[self._shard_for(key)][key] = (size, next(self._tick), 1)
+            self._current_size += size
+
         self._stats["current_size"] = self._current_size
-        self._stats["entries"] = len(self._lru_cache)
-        
+        self._stats["entries"] = sum(len(index) for index in self._shards)
+
     def _get_ttl(self, data_type: str) -> int:
         """Obtiene el TTL para un tipo de dato específico."""
         return self._ttl_policy.get(data_type, self._default_ttl)
-    
-    def _compress_value(self, value: Union[str, bytes]) -> tuple[str, int, bool]:
-        """Comprime un valor si supera el umbral."""
-        is_compressed = False
-        
-        # Si es bytes, convertir a base64 para JSON
+
+    @staticmethod
+    def _validate_key(key: str) -> None:
+        """Valida que la clave de caché sea un string."""
+        if not isinstance(key, str):
+            raise TypeError(f"La clave de caché debe ser str, no {type(key).__name__}")
+
+    def _compress(self, raw: bytes) -> bytes:
+        """Comprime con zstd si está disponible, si no con LZ4 (frame) o zlib."""
+        if self._codec == "zstd":
+            # Los compresores zstd no son thread-safe; se crea uno por llamada
+            return zstandard.ZstdCompressor(level=self._compression_level, threads=0).compress(raw)
+        if self._codec == "lz4":
+            return _LZ4_MAGIC + lz4.frame.compress(
+                raw, compression_level=self._compression_level, store_size=False
+            )
+        return zlib.compress(raw, self._compression_level)
+
+    @staticmethod
+    def _decompress(blob: bytes) -> bytes:
+        """Descomprime un bloque zstd, LZ4 o zlib según su prefijo."""
+        if blob[:len(_ZSTD_MAGIC)] == _ZSTD_MAGIC:
+            if zstandard is None:
+                raise ValueError("Entrada comprimida con zstd pero zstandard no está instalado")
+            return zstandard.ZstdDecompressor().decompress(blob)
+        if blob[:len(_LZ4_MAGIC)] == _LZ4_MAGIC:
+            if lz4 is None:
+                raise ValueError("Entrada comprimida con LZ4 pero lz4 no está instalado")
+            return lz4.frame.decompress(blob[len(_LZ4_MAGIC):])
+        return zlib.decompress(blob)
+
+    def _serialize_value(self, value: Any) -> Tuple[bytes, int, int, bool]:
+        """Serializa un valor y lo comprime si supera el umbral.
+
+        Returns:
+            Tupla (payload, tipo de valor, tamaño original, comprimido)
+        """
         if isinstance(value, bytes):
-            import base64
-            value = base64.b64encode(value).decode('utf-8')
-        elif not isinstance(value, str):
-            value = json.dumps(value)
-            
-        value_bytes = value.encode('utf-8')
-        original_size = len(value_bytes)
-        
+            value_type, raw = _TYPE_BYTES, value
+        elif isinstance(value, str):
+            value_type, raw = _TYPE_STR, value.encode('utf-8')
+        else:
+            value_type, raw = _TYPE_JSON, json.dumps(value).encode('utf-8')
+
+        original_size = len(raw)
+        is_compressed = False
+
         if original_size >= self._compression_threshold:
-            compressed = zlib.compress(value_bytes)
-            saved = original_size - len(compressed)
-            self._stats["compression_savings"] += saved
-            is_compressed = True
-            # Convertir bytes comprimidos a base64 para JSON
-            value = base64.b64encode(compressed).decode('utf-8')
-            
-        return value, original_size, is_compressed
-    
-    def _deserialize_value(self, value: Any, is_compressed: bool) -> Any:
-        """Deserializa y descomprime un valor si es necesario."""
-        if not isinstance(value, str):
-            return value
-            
+            compressed = self._compress(raw)
+            # Solo se guarda la forma comprimida si ahorra al menos un 10%
+            if len(compressed) <= original_size * (1 - _MIN_COMPRESSION_SAVINGS):
+                raw = compressed
+                is_compressed = True
+
+        return raw, value_type, original_size, is_compressed
+
+    @classmethod
+    def _deserialize_value(cls, payload: bytes, value_type: int, is_compressed: bool) -> Any:
+        """Descomprime y reconstruye un valor almacenado."""
+        if is_compressed:
+            payload = cls._decompress(payload)
+        if value_type == _TYPE_BYTES:
+            return bytes(payload)
+        if value_type == _TYPE_STR:
+            return payload.decode('utf-8')
+        return json.loads(payload)
+
+    def _shard_for(self, key: str) -> int:
+        """Índice del shard (lock + índice LRU) que corresponde a una clave."""
+        return hash(key) & (_NUM_SHARDS - 1)
+
+    def _remove_from_index(self, shard: int, key: str) -> None:
+        """Elimina una clave del índice de su shard. Requiere el lock del shard."""
+        item = self._shards[shard].pop(key, None)
+        if item is not None:
+            with self._size_lock:
+                self._current_size -= item[0]
+
+    def _touch(self, shard: int, key: str, size: int) -> None:
+        """Registra un acceso a la clave en el índice. Requiere el lock del shard."""
+        index = self._shards[shard]
+        if self._eviction == "counter" and key in index:
+            # Solo se incrementa el contador; el orden del índice no cambia
+            size, tick, count = index[key]
+            index[key] = (size, tick, count + 1)
+            if count + 1 >= _COUNTER_LIMIT:
+                # Aquí solo se tiene un lock; la división se hace después con todos
+                self._halve_pending = True
+            return
+        index[key] = (size, next(self._tick), 1)
+        index.move_to_end(key)
+
+    def _halve_counters(self) -> None:
+        """Divide a la mitad los contadores de acceso de todos los shards.
+
+        Toma todos los locks en orden fijo, como clear(), para que los
+        contadores de shards distintos sigan siendo comparables.
+        """
+        for lock in self._shard_locks:
+            lock.acquire()
         try:
-            import base64
-            
-            # Decodificar de base64 si está comprimido
-            if is_compressed:
-                compressed = base64.b64decode(value)
-                value = zlib.decompress(compressed)
-                try:
-                    # Intentar decodificar como JSON
-                    return json.loads(value.decode('utf-8'))
-                except (UnicodeDecodeError, json.JSONDecodeError):
-                    # Si no es JSON, devolver los bytes decodificados de base64
-                    return base64.b64decode(value)
-            
-            # Si no está comprimido, intentar cargar como JSON
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                # Si no es JSON, podría ser un string base64
-                try:
-                    return base64.b64decode(value)
-                except:
-                    return value
-                
-        except zlib.error:
-            return value
-    
+            if not self._halve_pending:
+                return  # Otro hilo ya los dividió
+            for index in self._shards:
+                for k, (s, t, c) in index.items():
+                    index[k] = (s, t, c >> 1)
+            self._halve_pending = False
+        finally:
+            for lock in reversed(self._shard_locks):
+                lock.release()
+
+    def _pick_victims(self, excess: int) -> List[Tuple[int, str]]:
+        """Elige las entradas (shard, clave) a expulsar según la política configurada.
+
+        En modo LRU compara solo la cabeza de cada shard y devuelve una
+        víctima. En modo "counter" recorre las entradas una sola vez y devuelve,
+        de menos a más accesos, las suficientes para liberar ``excess`` bytes.
+        """
+        if self._eviction == "counter":
+            candidates = []
+            for shard, lock in enumerate(self._shard_locks):
+                with lock:
+                    candidates.extend(
+                        ((count, tick), shard, key, size)
+                        for key, (size, tick, count) in self._shards[shard].items()
+                    )
+            heapq.heapify(candidates)
+            victims, freed = [], 0
+            while candidates and freed < excess:
+                _, shard, key, size = heapq.heappop(candidates)
+                victims.append((shard, key))
+                freed += size
+            return victims
+
+        victim, victim_tick = None, None
+        for shard, lock in enumerate(self._shard_locks):
+            with lock:
+                index = self._shards[shard]
+                if not index:
+                    continue
+                key, (_, tick, _) = next(iter(index.items()))
+            if victim_tick is None or tick < victim_tick:
+                victim, victim_tick = (shard, key), tick
+        return [victim] if victim is not None else []
+
     def _enforce_size_limit(self) -> None:
-        """Aplica el límite de tamaño eliminando entradas según LRU."""
-        while self._current_size > self._max_size_bytes and self._lru_cache:
-            key, size = self._lru_cache.popitem(last=False)  # FIFO
-            self._current_size -= size
-            cache_path = self._get_cache_path(key)
-            
-            try:
-                cache_path.unlink()
-                self._stats["evictions"] += 1
-            except OSError:
-                pass
-            
-        self._stats["current_size"] = self._current_size
-        
-    def _get_cache_path(self, key: str) -> Path:
-        """Obtiene la ruta del sistema de archivos para una clave de caché."""
-        return self._cache_dir / f"{sanitize_cache_filename(key)}.json"
+        """Aplica el límite de tamaño expulsando entradas según la política.
+
+        Se llama sin ningún lock de shard tomado; cada expulsión toma solo el
+        lock del shard afectado.
+        """
+        while True:
+            with self._size_lock:
+                excess = self._current_size - self._max_size_bytes
+            if excess <= 0:
+                return
+            victims = self._pick_victims(excess)
+            if not victims:
+                return
+            for shard, key in victims:
+                with self._shard_locks[shard]:
+                    item = self._shards[shard].pop(key, None)
+                    if item is None:
+                        continue  # Otro hilo la eliminó entre la elección y el lock
+                    size = item[0]
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                with self._size_lock:
+                    self._current_size -= size
+                    self._stats["evictions"] += 1
+
+    def _count_stat(self, name: str, amount: int = 1) -> None:
+        """Incrementa una estadística de forma thread-safe."""
+        with self._size_lock:
+            self._stats[name] += amount
 
     def cleanup(self) -> None:
         """Elimina todas las entradas expiradas del caché."""
-        with self._lock:
-            current_time = time.time()
-            expired_keys = []
-            
-            # Buscar archivos expirados
-            for cache_file in self._cache_dir.glob("*.json"):
-                try:
-                    with open(cache_file, 'r') as f:
-                        entry_dict = json.load(f)
-                        if entry_dict["expires"] <= current_time:
-                            expired_keys.append(cache_file.stem)
-                            cache_file.unlink()
-                except (json.JSONDecodeError, KeyError, OSError):
-                    # Si hay error, eliminar el archivo
-                    try:
-                        cache_file.unlink()
-                    except OSError:
-                        pass
-            
-            # Actualizar estructuras internas
+        current_time = self._clock()
+        try:
+            expired_keys = [
+                key for (key,) in self._db.execute(
+                    "SELECT key FROM entries WHERE expires <= ?", (current_time,)
+                )
+            ]
             for key in expired_keys:
-                if key in self._lru_cache:
-                    self._current_size -= self._lru_cache[key]
-                    del self._lru_cache[key]
-                    self._stats["evictions"] += 1
-            
-            self._stats["current_size"] = self._current_size
-            self._stats["entries"] = len(self._lru_cache)
-            self._last_cleanup = current_time
+                shard = self._shard_for(key)
+                with self._shard_locks[shard]:
+                    self._db.execute(
+                        "DELETE FROM entries WHERE key = ? AND expires <= ?", (key, current_time)
+                    )
+                    self._remove_from_index(shard, key)
+                self._count_stat("evictions")
+        except sqlite3.Error as e:
+            logger.warning(f"Error limpiando caché: {e}")
+
+    @staticmethod
+    def hash_key(key: str) -> bytes:
+        """Calcula la clave de 16 bytes para get_b/set_b (BLAKE3, o BLAKE2b sin blake3).
+
+        Permite hashear una sola vez claves largas que se consultan a menudo.
+        """
+        data = key.encode('utf-8')
+        if blake3 is not None:
+            return blake3(data).digest(length=KEY_HASH_SIZE)
+        return hashlib.blake2b(data, digest_size=KEY_HASH_SIZE).digest()
+
+    @staticmethod
+    def _validate_key_hash(key_hash: bytes) -> None:
+        """Valida que la clave hasheada sea bytes del tamaño esperado."""
+        if not isinstance(key_hash, bytes) or len(key_hash) != KEY_HASH_SIZE:
+            raise TypeError(f"La clave hasheada debe ser bytes de {KEY_HASH_SIZE} bytes")
 
     def get(self, key: str) -> Optional[Any]:
         """Obtiene un valor del caché.
-        
+
         Args:
             key: Clave a recuperar
-            
+
         Returns:
             Valor en caché si se encuentra y no ha expirado, None en caso contrario
         """
-        cache_path = self._get_cache_path(key)
-        
-        with self._lock:
-            # Verificar si es necesario hacer limpieza
-            current_time = time.time()
-            if current_time - self._last_cleanup >= self._cleanup_interval:
-                self.cleanup()
+        self._validate_key(key)
+        return self._get(key)
+
+    def get_b(self, key_hash: bytes) -> Optional[Any]:
+        """Obtiene un valor por su clave hasheada (ver hash_key).
+
+        Args:
+            key_hash: Clave de 16 bytes
+
+        Returns:
+            Valor en caché si se encuentra y no ha expirado, None en caso contrario
+        """
+        self._validate_key_hash(key_hash)
+        return self._get(key_hash)
+
+    def _get(self, key: Union[str, bytes]) -> Optional[Any]:
+        """Implementación de get/get_b sobre una clave ya validada."""
+        value = self._lookup(key)
+        if self._halve_pending:
+            self._halve_counters()
+        return value
+
+    def _lookup(self, key: Union[str, bytes]) -> Optional[Any]:
+        """Lee una entrada y registra el acceso bajo el lock de su shard."""
+        current_time = self._clock()
+        shard = self._shard_for(key)
+        with self._shard_locks[shard]:
+            index = self._shards[shard]
             try:
-                if not cache_path.exists():
-                    self._stats["misses"] += 1
+                row = self._db.execute(
+                    "SELECT expires, value_type, compressed, size, value FROM entries WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is None:
+                    self._remove_from_index(shard, key)
+                    self._count_stat("misses")
                     return None
-                
-                with open(cache_path, 'r') as f:
-                    entry_dict = json.load(f)
-                    is_compressed = entry_dict.pop("is_compressed", False)
-                    entry = CacheEntry.from_dict(entry_dict)
-                
-                # Verificar expiración
-                if entry.expires <= time.time():
-                    cache_path.unlink()
-                    self._lru_cache.pop(key, None)
-                    self._current_size -= entry.size
-                    self._stats["evictions"] += 1
-                    self._stats["misses"] += 1
+
+                expires, value_type, is_compressed, size, payload = row
+
+                # Verificar expiración (perezosa; el janitor purga el resto en bloque)
+                if expires <= current_time:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._remove_from_index(shard, key)
+                    with self._size_lock:
+                        self._stats["evictions"] += 1
+                        self._stats["misses"] += 1
                     return None
-                
-                # Actualizar LRU
-                if key in self._lru_cache:
-                    self._lru_cache.move_to_end(key)
-                
-                entry.last_accessed = time.time()
-                with open(cache_path, 'w') as f:
-                    json.dump(entry.to_dict(), f)
-                
-                self._stats["hits"] += 1
-                return self._deserialize_value(entry.value, is_compressed)
-                
-            except (json.JSONDecodeError, KeyError, OSError) as e:
+
+                value = self._deserialize_value(payload, value_type, is_compressed)
+
+                # Registrar el acceso (la entrada puede venir de otra instancia sobre el mismo directorio)
+                if key not in index:
+                    with self._size_lock:
+                        self._current_size += size
+                self._touch(shard, key, size)
+
+                self._count_stat("hits")
+                return value
+
+            except (sqlite3.Error, zlib.error, RuntimeError, ValueError) as e:
                 logger.warning(f"Error leyendo caché para clave {key}: {e}")
                 try:
-                    cache_path.unlink()
-                    self._lru_cache.pop(key, None)
-                except OSError:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                except sqlite3.Error:
                     pass
-                self._stats["misses"] += 1
+                self._remove_from_index(shard, key)
+                self._count_stat("misses")
                 return None
 
     def set(self, key: str, value: Any, data_type: str = "default", ttl: Optional[int] = None) -> None:
         """Establece un valor en el caché.
-        
+
+        El caché es de mejor esfuerzo: si el valor no es serializable a JSON, o
+        la escritura falla, se registra el error y no se guarda nada.
+
         Args:
             key: Clave de caché
             value: Valor a almacenar
             data_type: Tipo de dato para política de TTL
         """
-        cache_path = self._get_cache_path(key)
-        
-        with self._lock:
+        self._validate_key(key)
+        self._set(key, value, data_type, ttl)
+
+    def set_b(self, key_hash: bytes, value: Any, data_type: str = "default",
+              ttl: Optional[int] = None) -> None:
+        """Establece un valor por su clave hasheada (ver hash_key).
+
+        Args:
+            key_hash: Clave de 16 bytes
+            value: Valor a almacenar
+            data_type: Tipo de dato para política de TTL
+        """
+        self._validate_key_hash(key_hash)
+        self._set(key_hash, value, data_type, ttl)
+
+    def _set(self, key: Union[str, bytes], value: Any, data_type: str, ttl: Optional[int]) -> None:
+        """Implementación de set/set_b sobre una clave ya validada."""
+        try:
+            # Serializar y comprimir fuera de cualquier lock
+            payload, value_type, original_size, is_compressed = self._serialize_value(value)
+        except TypeError as e:
+            logger.error(f"Error escribiendo caché para clave {key}: {e}")
+            return
+
+        # Validar TTL
+        if ttl is not None:
+            if ttl < 0:
+                ttl = self._get_ttl(data_type)
+        else:
+            ttl = self._get_ttl(data_type)
+
+        shard = self._shard_for(key)
+        with self._shard_locks[shard]:
             try:
-                # Comprimir y serializar
-                compressed_value, original_size, is_compressed = self._compress_value(value)
-                
-                # Validar TTL
-                if ttl is not None:
-                    if ttl < 0:
-                        ttl = self._get_ttl(data_type)
-                else:
-                    ttl = self._get_ttl(data_type)
-                
-                # Crear entrada
-                entry = CacheEntry(
-                    value=compressed_value,
-                    expires=time.time() + ttl,
-                    size=original_size,
-                    data_type=data_type
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, expires, data_type, value_type, compressed, size, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, self._clock() + ttl, data_type, value_type, is_compressed,
+                     original_size, payload)
                 )
-                
-                # Añadir metadato de compresión
-                entry_dict = entry.to_dict()
-                entry_dict["is_compressed"] = is_compressed
-                
-                # Actualizar tamaño
-                old_size = 0
-                if key in self._lru_cache:
-                    old_size = self._lru_cache[key]
-                    self._current_size -= old_size
-                
+            except sqlite3.Error as e:
+                logger.error(f"Error escribiendo caché para clave {key}: {e}")
+                return
+
+            # Actualizar tamaño
+            self._remove_from_index(shard, key)
+            self._touch(shard, key, original_size)
+            with self._size_lock:
                 self._current_size += original_size
-                self._lru_cache[key] = original_size
-                self._lru_cache.move_to_end(key)
-                
-                # Aplicar límite de tamaño
-                self._enforce_size_limit()
-                
-                # Guardar entrada
-                with open(cache_path, 'w') as f:
-                    # Escribir en archivo temporal primero
-                    temp_path = cache_path.with_suffix('.tmp')
-                    with open(temp_path, 'w') as temp_f:
-                        json.dump(entry_dict, temp_f)
-                    
-                    # Mover archivo temporal al destino final
-                    temp_path.replace(cache_path)
-                
-                self._stats["current_size"] = self._current_size
-                self._stats["entries"] = len(self._lru_cache)
-                    
-            except (OSError, TypeError) as e:
+                if is_compressed:
+                    self._stats["compression_savings"] += original_size - len(payload)
+
+        # Aplicar límite de tamaño
+        try:
+            self._enforce_size_limit()
+        except sqlite3.Error as e:
+            logger.error(f"Error aplicando el límite de tamaño del caché: {e}")
+
+    def set_many(self, items: Dict[str, Any], data_type: str = "default",
+                 ttl: Optional[int] = None) -> None:
+        """Establece varios valores en una sola transacción.
+
+        Args:
+            items: Mapa clave -> valor a almacenar
+            data_type: Tipo de dato para política de TTL (común a todas las claves)
+            ttl: TTL común opcional; si falta o es negativo se usa el del tipo de dato
+        """
+        for key in items:
+            self._validate_key(key)
+
+        # Serializar y comprimir fuera de cualquier lock
+        rows = []
+        for key, value in items.items():
+            try:
+                payload, value_type, original_size, is_compressed = self._serialize_value(value)
+            except TypeError as e:
                 logger.error(f"Error escribiendo caché para clave {key}: {e}")
+                continue
+            rows.append((key, payload, value_type, original_size, is_compressed))
+        if not rows:
+            return
+
+        if ttl is None or ttl < 0:
+            ttl = self._get_ttl(data_type)
+
+        # Tomar los shards implicados en orden fijo (el mismo que clear()) para evitar interbloqueos
+        shards = sorted({self._shard_for(key) for key, *_ in rows})
+        for shard in shards:
+            self._shard_locks[shard].acquire()
+        try:
+            expires = self._clock() + ttl
+            db = self._db
+            try:
+                db.execute("BEGIN")
+                db.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, expires, data_type, value_type, compressed, size, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(key, expires, data_type, value_type, is_compressed, original_size, payload)
+                     for key, payload, value_type, original_size, is_compressed in rows]
+                )
+                db.execute("COMMIT")
+            except sqlite3.Error as e:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                logger.error(f"Error escribiendo {len(rows)} entradas en caché: {e}")
+                return
+
+            added_size = 0
+            savings = 0
+            for key, payload, _, original_size, is_compressed in rows:
+                shard = self._shard_for(key)
+                self._remove_from_index(shard, key)
+                self._touch(shard, key, original_size)
+                added_size += original_size
+                if is_compressed:
+                    savings += original_size - len(payload)
+            with self._size_lock:
+                self._current_size += added_size
+                self._stats["compression_savings"] += savings
+        finally:
+            for shard in reversed(shards):
+                self._shard_locks[shard].release()
+
+        # Aplicar límite de tamaño una sola vez para todo el lote
+        try:
+            self._enforce_size_limit()
+        except sqlite3.Error as e:
+            logger.error(f"Error aplicando el límite de tamaño del caché: {e}")
 
     def delete(self, key: str) -> None:
         """Elimina una entrada del caché.
-        
+
         Args:
             key: Clave de caché a eliminar
         """
-        cache_path = self._get_cache_path(key)
-        
-        with self._lock:
+        self._validate_key(key)
+
+        shard = self._shard_for(key)
+        with self._shard_locks[shard]:
             try:
-                if key in self._lru_cache:
-                    self._current_size -= self._lru_cache[key]
-                    del self._lru_cache[key]
-                cache_path.unlink()
-                self._stats["current_size"] = self._current_size
-                self._stats["entries"] = len(self._lru_cache)
-            except OSError:
-                pass
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._remove_from_index(shard, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Error eliminando clave de caché {key}: {e}")
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Elimina todas las entradas cuya clave empieza por un prefijo.
+
+        Args:
+            prefix: Prefijo de clave (no vacío)
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        self._validate_key(prefix)
+        if not prefix:
+            raise ValueError("El prefijo no puede estar vacío")
+
+        # Tomar todos los shards en orden fijo, como clear(), para que la base de datos
+        # y el índice en memoria cambien juntos
+        for lock in self._shard_locks:
+            lock.acquire()
+        try:
+            try:
+                # Comparar el prefijo exacto (sin cota superior, que no existe para U+10FFFF);
+                # la cota inferior permite empezar el recorrido en la clave primaria
+                removed = self._db.execute(
+                    "DELETE FROM entries WHERE key >= ? AND substr(key, 1, ?) = ?",
+                    (prefix, len(prefix), prefix)
+                ).rowcount
+            except sqlite3.Error as e:
+                logger.warning(f"Error eliminando prefijo de caché {prefix}: {e}")
+                return 0
+
+            for shard, index in enumerate(self._shards):
+                for key in [k for k in index if isinstance(k, str) and k.startswith(prefix)]:
+                    self._remove_from_index(shard, key)
+        finally:
+            for lock in reversed(self._shard_locks):
+                lock.release()
+        return removed
 
     def clear(self) -> None:
         """Limpia todas las entradas del caché."""
-        with self._lock:
-            for cache_file in self._cache_dir.glob("*.json"):
-                try:
-                    cache_file.unlink()
-                except OSError:
-                    pass
-            self._lru_cache.clear()
-            self._current_size = 0
-            self._stats = {
-                "hits": 0,
-                "misses": 0,
-                "evictions": 0,
-                "compression_savings": 0,
-                "current_size": 0,
-                "entries": 0
-            }
+        # Tomar todos los shards en orden fijo para evitar interbloqueos
+        for lock in self._shard_locks:
+            lock.acquire()
+        try:
+            try:
+                self._db.execute("DELETE FROM entries")
+            except sqlite3.Error as e:
+                logger.warning(f"Error limpiando caché: {e}")
+            for index in self._shards:
+                index.clear()
+            with self._size_lock:
+                self._current_size = 0
+                self._stats = {
+                    "hits": 0,
+                    "misses": 0,
+                    "evictions": 0,
+                    "compression_savings": 0,
+                    "current_size": 0,
+                    "entries": 0
+                }
+        finally:
+            for lock in reversed(self._shard_locks):
+                lock.release()
+
+    def close(self) -> None:
+        """Detiene el janitor y cierra las conexiones SQLite de todos los hilos."""
+        self._stop_janitor.set()
+        if self._janitor.is_alive() and self._janitor is not threading.current_thread():
+            self._janitor.join(timeout=5)
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for db in connections:
+            db.close()
+        self._local.db = None
 
     def get_stats(self) -> Dict[str, int]:
         """Obtiene estadísticas del caché.
-        
+
         Returns:
             Dict con conteos de hits/misses/evictions y métricas de tamaño
         """
-        with self._lock:
+        with self._size_lock:
             stats = self._stats.copy()
-            stats["memory_usage"] = sys.getsizeof(self._lru_cache)
-            return stats
\ No newline at end of file
+            stats["current_size"] = self._current_size
+        stats["entries"] = sum(len(index) for index in self._shards)
+        stats["memory_usage"] = sum(sys.getsizeof(index) for index in self._shards)
+        return stats
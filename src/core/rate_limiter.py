@@ -1,7 +1,7 @@
 """Token bucket rate limiter implementation with fixed-point arithmetic."""
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 from threading import Lock
 import logging
 
@@ -9,6 +9,7 @@ logger = logging.getLogger(__name__)
 
 # Use integer arithmetic with fixed-point scaling
 SCALE_FACTOR = 1000000  # 6 decimal places of precision
+NS_PER_SECOND = 1_000_000_000
 
 def _to_fixed(value: float) -> int:
     """Convert float to fixed-point integer."""
@@ -24,13 +25,28 @@ class TokenBucket:
     capacity: int      # Maximum number of tokens (fixed-point)
     fill_rate: int     # Tokens per second (fixed-point)
     tokens: int = 0    # Current token count (fixed-point)
-    last_update: int = 0  # Last update timestamp in nanoseconds
+    last_update: Optional[int] = None  # Last update timestamp in nanoseconds
+    carry: int = 0     # Sub-token remainder of the last refill (fixed-point * ns)
 
 class RateLimiter:
     """Token bucket rate limiter implementation using fixed-point arithmetic."""
-    def __init__(self):
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize the rate limiter.
+        
+        Args:
+            clock: Function returning the current time in seconds (default: time.monotonic)
+            sleep: Function that blocks for the given seconds, measured on `clock`
+                (default: time.sleep)
+        """
         self._buckets: Dict[str, TokenBucket] = {}
         self._lock = Lock()
+        self._clock = clock
+        self._sleep = sleep
+        
+    def _now_ns(self) -> int:
+        """Current clock reading in nanoseconds."""
+        return round(self._clock() * NS_PER_SECOND)
         
     def create_limit(self, key: str, capacity: float, fill_rate: float) -> None:
         """Create a new rate limit bucket.
@@ -45,20 +61,20 @@ class RateLimiter:
                 capacity=_to_fixed(capacity),
                 fill_rate=_to_fixed(fill_rate),
                 tokens=_to_fixed(capacity),  # Start full
-                last_update=int(time.time_ns())
+                last_update=self._now_ns()
             )
 
     def _update_tokens(self, bucket: TokenBucket) -> None:
         """Update token count based on elapsed time using fixed-point arithmetic."""
-        now_ns = time.time_ns()
-        if bucket.last_update:
-            # Calculate elapsed time in seconds with nanosecond precision
+        now_ns = self._now_ns()
+        if bucket.last_update is not None:
+            # Integer-only refill; the remainder carries over so no fraction is lost
             elapsed_ns = now_ns - bucket.last_update
-            elapsed_seconds = elapsed_ns / 1e9
-            
-            # Calculate new tokens using fixed-point multiplication
-            new_tokens = int(elapsed_seconds * bucket.fill_rate)
-            bucket.tokens = min(bucket.capacity, bucket.tokens + new_tokens)
+            new_tokens, bucket.carry = divmod(elapsed_ns * bucket.fill_rate + bucket.carry, NS_PER_SECOND)
+            bucket.tokens += new_tokens
+            if bucket.tokens >= bucket.capacity:
+                bucket.tokens = bucket.capacity
+                bucket.carry = 0
             
         bucket.last_update = now_ns
 
@@ -91,16 +107,15 @@ class RateLimiter:
                 if not wait:
                     return False
                 
-                # Calculate sleep time needed for enough tokens
+                # Calculate sleep time needed for enough tokens (both values are fixed-point)
                 needed = tokens_fixed - bucket.tokens
-                # Convert to float for division to maintain precision
-                sleep_time = _from_fixed(needed) / _from_fixed(bucket.fill_rate)
+                sleep_time = needed / bucket.fill_rate
                 
                 # Release lock while sleeping
                 self._lock.release()
                 try:
                     # Add small buffer to avoid waking up just slightly too early
-                    time.sleep(sleep_time + 0.0001)
+                    self._sleep(sleep_time + 0.0001)
                 finally:
                     self._lock.acquire()
 
@@ -97,7 +97,9 @@ class MainWindow(QMainWindow):
         main_splitter.setChildrenCollapsible(False)
 
         # === PANEL IZQUIERDO: Área principal ===
-        left_panel = QWidget()
+        # Las secciones se guardan como atributos para acceder a ellas sin recorrer el árbol de widgets
+        self.file_selection_section = left_panel = QWidget()
+        left_panel.setAccessibleName(tr("accessibility.sections.file_selection"))
         left_layout = QVBoxLayout(left_panel)
         left_layout.setSpacing(8)
         left_layout.setContentsMargins(0, 0, 0, 0)
@@ -178,11 +180,14 @@ class MainWindow(QMainWindow):
 
         # Tabla de archivos (ocupa la mayor parte del espacio)
         self.file_results_table = FileResultsTableWidget()
+        self.file_results_table.setAccessibleName(tr("accessibility.sections.results"))
         self.file_results_table.files_added.connect(self.on_files_added)
+        self.results_section = self.file_results_table
         left_layout.addWidget(self.file_results_table, 1)  # Factor de estiramiento 1
 
         # === PANEL DERECHO: Panel de control ===
-        right_panel = QWidget()
+        self.options_section = right_panel = QWidget()
+        right_panel.setAccessibleName(tr("accessibility.sections.options"))
         right_panel.setMaximumWidth(350)  # Limitar ancho del panel derecho
         right_panel.setMinimumWidth(280)
         right_layout = QVBoxLayout(right_panel)
@@ -520,6 +525,9 @@ class MainWindow(QMainWindow):
         # Update accessibility text
         central_widget = self.centralWidget()
         central_widget.setAccessibleName(tr("accessibility.main_window"))
+        self.file_selection_section.setAccessibleName(tr("accessibility.sections.file_selection"))
+        self.options_section.setAccessibleName(tr("accessibility.sections.options"))
+        self.results_section.setAccessibleName(tr("accessibility.sections.results"))
         self.theme_btn.setAccessibleName(tr("accessibility.buttons.theme.name"))
         self.theme_btn.setAccessibleDescription(tr("accessibility.buttons.theme.desc"))
         self.add_files_btn.setAccessibleName(tr("accessibility.buttons.add_files.name"))
@@ -45,6 +45,17 @@ BLACKLIST_GENRE_TERMS_MODEL = {
     "album", "single", "track", "version", "original", "extended", "instrumental"
 }
 
+# Todos los términos en una sola alternancia: una pasada por fragmento en lugar
+# de una búsqueda de subcadena por término
+BLACKLIST_GENRE_TERMS_PATTERN = re.compile(
+    "|".join(map(re.escape, sorted(BLACKLIST_GENRE_TERMS_MODEL)))
+)
+
+# Patrones de clean_and_split_genre_payload, compilados una vez
+GENRE_WHITESPACE_PATTERN = re.compile(r'\s+')  # También cubre \r, \n y \t
+GENRE_SEPARATOR_PATTERN = re.compile(r'[;,/]')
+GENRE_YEAR_PATTERN = re.compile(r'\s*\b(19|20)\d{2}\b')
+
 class UpdateBuffer:
     """Buffer para actualizaciones por lotes."""
     def __init__(self, batch_size: int = 50):
@@ -113,21 +124,20 @@ def clean_and_split_genre_payload(raw_genre_name: str) -> List[str]:
     if not raw_genre_name:
         return []
 
-    # Primero limpiar caracteres especiales y espacios extras
-    cleaned = re.sub(r'[\r\n\t]+', ' ', raw_genre_name)
-    cleaned = re.sub(r'\s+', ' ', cleaned)
+    # Primero limpiar caracteres especiales y espacios extras en una sola pasada
+    cleaned = GENRE_WHITESPACE_PATTERN.sub(' ', raw_genre_name)
     
-    raw_items = re.split(r'[;,/]', cleaned)
+    raw_items = GENRE_SEPARATOR_PATTERN.split(cleaned)
     genres_cleaned_parts = []
 
     for item in raw_items:
         genre_part = item.strip()
         if not genre_part:
             continue
-        if any(term in genre_part.lower() for term in BLACKLIST_GENRE_TERMS_MODEL):
+        if BLACKLIST_GENRE_TERMS_PATTERN.search(genre_part.lower()):
             continue
-        if re.search(r'\b(19|20)\d{2}\b', genre_part):  # Corregido el regex
-            genre_part = re.sub(r'\s*\b(19|20)\d{2}\b', '', genre_part)
+        # sub sin search previo: si no hay año, la cadena queda igual
+        genre_part = GENRE_YEAR_PATTERN.sub('', genre_part)
         
         genre_title_case = genre_part.title()
         genre_title_case = genre_title_case.strip()  # Asegurar que no haya espacios extras
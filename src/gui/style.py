@@ -1,6 +1,7 @@
 """Módulo de estilos para la GUI de Genre Detector."""
 from enum import Enum
 from dataclasses import dataclass
+from functools import lru_cache
 from PySide6.QtWidgets import QWidget
 from PySide6.QtGui import QPalette, QColor
 
@@ -68,13 +69,21 @@ class ThemeManager:
     @classmethod
     def apply_theme(cls, widget: QWidget, theme_type: ThemeType) -> None:
         """Aplica un tema específico a un widget y sus descendientes."""
-        scheme = cls.LIGHT_SCHEME if theme_type == ThemeType.LIGHT else cls.DARK_SCHEME
-        cls._apply_palette(widget, scheme)
-        cls._apply_stylesheets(widget, scheme)
+        # La paleta se construye una vez por tema; QPalette es de copia
+        # implícita, así que compartir la instancia cacheada es seguro
+        widget.setPalette(cls._build_palette(theme_type))
+        widget.setStyleSheet(_LIGHT_SS if theme_type == ThemeType.LIGHT else _DARK_SS)
 
     @classmethod
-    def _apply_palette(cls, widget: QWidget, scheme: ColorScheme) -> None:
-        """Aplica la paleta de colores al widget."""
+    def _scheme_for(cls, theme_type: ThemeType) -> ColorScheme:
+        """Devuelve el esquema de colores de un tema."""
+        return cls.LIGHT_SCHEME if theme_type == ThemeType.LIGHT else cls.DARK_SCHEME
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _build_palette(cls, theme_type: ThemeType) -> QPalette:
+        """Construye la paleta de colores de un tema."""
+        scheme = cls._scheme_for(theme_type)
         palette = QPalette()
 
         # Colores generales
@@ -99,12 +108,11 @@ class ThemeManager:
         palette.setColor(QPalette.Disabled, QPalette.Button, scheme.disabled_background)
         palette.setColor(QPalette.Disabled, QPalette.Highlight, scheme.disabled_background)
 
-        widget.setPalette(palette)
+        return palette
 
-    @classmethod
-    def _apply_stylesheets(cls, widget: QWidget, scheme: ColorScheme) -> None:
-        """Aplica hojas de estilo específicas por componente."""
-        widget.setStyleSheet(f"""
+def _render_stylesheet(scheme: ColorScheme) -> str:
+    """Genera las hojas de estilo específicas por componente de un esquema."""
+    return f"""
             /* Tooltips */
             QToolTip {{
                 color: {scheme.on_surface.name()};
@@ -205,7 +213,12 @@ class ThemeManager:
                 color: {scheme.on_surface.name()};
                 border-top: 1px solid {scheme.border.name()};
             }}
-        """)
+    """
+
+# Los esquemas no cambian en tiempo de ejecución: sus hojas de estilo se generan
+# una sola vez al importar el módulo
+_LIGHT_SS = _render_stylesheet(ThemeManager.LIGHT_SCHEME)
+_DARK_SS = _render_stylesheet(ThemeManager.DARK_SCHEME)
 
 # Funciones de compatibilidad para código existente
 def apply_light_theme(widget: QWidget) -> None:
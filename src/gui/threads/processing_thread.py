@@ -3,8 +3,11 @@ import os
 import uuid
 from pathlib import Path
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from threading import Event
 from PySide6.QtCore import QThread, Signal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 
 from ...core.file_handler import Mp3FileHandler
 from ..models.genre_model import GenreModel
@@ -12,52 +15,31 @@ from .task_queue import TaskQueue, TaskState, Task
 
 logger = logging.getLogger(__name__)
 
-class ProcessingThread(QThread):
-    """Hilo para procesamiento asíncrono de archivos con cola de tareas."""
-    progress = Signal(str)
-    finished = Signal(dict)
-    file_processed = Signal(str, str, bool)  # filepath, message, is_error
-    task_state_changed = Signal(str, TaskState)  # task_id, new_state
-    circuit_breaker_opened = Signal()
-    circuit_breaker_closed = Signal()
+@dataclass
+class BatchCallbacks:
+    """Receptores de los eventos de `_BatchWorker._process_batch`.
 
-    def __init__(self, file_paths: List[str] = None, model: GenreModel = None,
-                 confidence: float = 0.3, max_genres: int = 3,
-                 rename_files: bool = False, backup_dir: Optional[str] = None,
-                 task_queue: Optional[TaskQueue] = None, parent=None):
-        super().__init__(parent)
-        from threading import Lock
-        self._thread_lock = Lock()
-        self.file_paths = file_paths if file_paths is not None else []
-        self.confidence = confidence
-        self.max_genres = max_genres
-        self.rename_files = rename_files
-        self.backup_dir = backup_dir
-        self.model = model
-        # Inicializar TaskQueue si no se proporciona una
-        self.task_queue = task_queue if task_queue is not None else TaskQueue()
-        self.is_running = True
-        # Asegurar que el file_handler del modelo use el backup_dir proporcionado al thread.
-        if self.model and hasattr(self.model, 'detector') and self.model.detector and \
-           hasattr(self.model.detector, 'file_handler') and self.model.detector.file_handler:
-            if hasattr(self.model.detector.file_handler, 'set_backup_dir'):
-                current_fh_backup_dir = getattr(self.model.detector.file_handler, 'backup_dir', None)
-                new_thread_backup_path_obj = Path(self.backup_dir) if self.backup_dir else None
-                if current_fh_backup_dir != new_thread_backup_path_obj:
-                    self.model.detector.file_handler.set_backup_dir(self.backup_dir)
-                else:
-                    logger.debug(f"ProcessingThread: backup_dir ({self.backup_dir}) ya está configurado en file_handler.")
-            else:
-                logger.error("ProcessingThread: Mp3FileHandler en el modelo no tiene método 'set_backup_dir'. "
-                             "El respaldo podría no funcionar como se espera.")
-        else:
-            logger.error("ProcessingThread: No se pudo acceder a model.detector.file_handler. "
-                         "El respaldo podría no funcionar como se espera.")
-        self.is_running = True
+    En `ProcessingThread` son los `emit` de sus señales; en pruebas pueden ser
+    callables cualesquiera, sin necesidad de un QThread.
+    """
+    progress: Callable[[str], None]
+    finished: Callable[[dict], None]
+    file_processed: Callable[[str, str, bool], None]  # filepath, message, is_error
+    task_state_changed: Callable[[str, TaskState], None]  # task_id, new_state
+    circuit_breaker_opened: Callable[[], None]
+    circuit_breaker_closed: Callable[[], None]
+
+class _BatchWorker:
+    """Lógica de procesamiento por lotes, independiente de Qt.
+
+    Requiere los atributos model, confidence, max_genres, rename_files,
+    task_queue, is_running, _stop_event y _thread_lock.
+    """
 
     def stop(self):
         """Detiene el procesamiento de manera segura."""
         self.is_running = False
+        self._stop_event.set()  # Interrumpe las esperas en curso de _process_batch()
         
     def process_file(self, filepath: str) -> Dict[str, Any]:
         """Procesa un archivo individual."""
@@ -77,19 +59,24 @@ class ProcessingThread(QThread):
             logger.error(f"Excepción en process_file para {filepath}: {str(e)}", exc_info=True) # Added logging with exc_info
             return {"error": str(e)}
 
-    def run(self):
-        """Ejecuta el procesamiento de archivos en segundo plano usando la cola de tareas."""
-        logger.info("ProcessingThread.run iniciado.") # Added logging
+    def _process_batch(self, file_paths: List[str], callbacks: BatchCallbacks) -> None:
+        """Procesa un lote de archivos usando la cola de tareas.
+
+        Args:
+            file_paths: Rutas de los archivos a procesar
+            callbacks: Receptores de los eventos de progreso y resultado
+        """
+        logger.info("Procesamiento de lote iniciado.") # Added logging
         if not hasattr(self, '_thread_lock'):
             from threading import Lock
             self._thread_lock = Lock()
         
-        total_files = len(self.file_paths)  # <-- Inicialización temprana
+        total_files = len(file_paths)  # <-- Inicialización temprana
         
-        if not self.file_paths:
+        if not file_paths:
             logger.info("No hay archivos seleccionados para procesar. Finalizando run.") # Added logging
-            self.progress.emit("No hay archivos seleccionados para procesar.")
-            self.finished.emit({
+            callbacks.progress("No hay archivos seleccionados para procesar.")
+            callbacks.finished({
                 "total": 0,
                 "success": 0,
                 "errors": 0,
@@ -98,7 +85,7 @@ class ProcessingThread(QThread):
             })
             return
 
-        logger.info(f"Total de archivos a procesar: {len(self.file_paths)}") # Added logging
+        logger.info(f"Total de archivos a procesar: {len(file_paths)}") # Added logging
 
         # Inicializar contadores
         processed_count = 0
@@ -110,7 +97,7 @@ class ProcessingThread(QThread):
         # Crear tareas para cada archivo
         logger.info("Creando tareas para cada archivo.") # Added logging
         tasks = {}
-        for filepath in self.file_paths:
+        for filepath in file_paths:
             task_id = str(uuid.uuid4())
             with self._thread_lock:
                 task = self.task_queue.add_task(
@@ -121,142 +108,160 @@ class ProcessingThread(QThread):
                 tasks[task_id] = (task, filepath)
         logger.info(f"Tareas creadas: {len(tasks)}") # Added logging
 
-        # Procesar tareas
+        # Procesar tareas en paralelo (E/S: lectura de tags y consultas HTTP).
+        # Los resultados se agregan y los callbacks se invocan solo desde este hilo.
         retry_count = 0
         max_retries = 3
+        max_workers = min(8, len(file_paths))
+        in_flight = {}  # future -> (task, filepath)
         
         logger.info("Iniciando procesamiento de tareas.") # Added logging
-        while self.is_running and processed_count < len(self.file_paths):
-            task = self.task_queue.get_next_task()
-            if not task:
-                if self.task_queue.circuit_breaker.is_open:
-                    if retry_count < max_retries:
-                        self.circuit_breaker_opened.emit()
-                        self.msleep(min(5000 * (retry_count + 1), 30000))  # Backoff exponencial
-                        retry_count += 1
-                        continue
-                    else:
-                        logger.error("Máximo número de reintentos alcanzado")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while in_flight or (self.is_running and processed_count < len(file_paths)):
+                if not self.is_running:
+                    # Al detenerse, cancelar lo que aún no empezó; lo que está en curso
+                    # puede escribir o renombrar archivos, así que se sigue recogiendo
+                    for future in [f for f in in_flight if f.cancel()]:
+                        task, _ = in_flight.pop(future)
+                        self.task_queue.cancel_task(task.id)
+                        callbacks.task_state_changed(task.id, TaskState.CANCELLED)
+                    if not in_flight:
                         break
-                else:
-                    # Si no hay más tareas pero no hemos procesado todo, esperar brevemente
-                    if processed_count < len(self.file_paths):
-                        self.msleep(100)
-                        continue
-                    break
 
-            try:
-                filepath = next(fp for _, (t, fp) in tasks.items() if t == task)
-                logger.debug(f"Obtenido filepath {filepath} para tarea {task.id}") # Added logging
-            except StopIteration:
-                logger.error("No se encontró el filepath asociado a la tarea")
-                continue
-            logger.info(f"Emitiendo progress signal para {Path(filepath).name}") # Added logging
-            self.progress.emit(f"Procesando {Path(filepath).name}")
-            try:
-                logger.debug(f"Iniciando ejecución de tarea {task.id} para {filepath}") # Added logging
-                with self._thread_lock:
+                # Mantener el pool lleno mientras el circuit breaker lo permita
+                while self.is_running and len(in_flight) < max_workers:
+                    task = self.task_queue.get_next_task()
+                    if not task:
+                        break
+                    entry = tasks.get(task.id)
+                    if entry is None:
+                        logger.error("No se encontró el filepath asociado a la tarea")
+                        continue
+                    filepath = entry[1]
+                    logger.info(f"Emitiendo progress signal para {Path(filepath).name}") # Added logging
+                    callbacks.progress(f"Procesando {Path(filepath).name}")
                     logger.debug(f"Emitiendo task_state_changed RUNNING para tarea {task.id}") # Added logging
-                    self.task_state_changed.emit(task.id, TaskState.RUNNING)
-                    result = task.func(task.args[0])
-                    logger.debug(f"Tarea {task.id} ejecutada. Resultado: {result}") # Added logging
-                    
-                    actual_error = result.get("error")
-                    if actual_error:
-                        logger.error(f"Tarea {task.id} fallida con error: {actual_error}") # Added logging
-                        self.task_queue.complete_task(task, error=actual_error)
-                        logger.debug(f"Emitiendo task_state_changed FAILED para tarea {task.id}") # Added logging
-                        self.task_state_changed.emit(task.id, TaskState.FAILED)
-                        error_count += 1
-                        logger.error(f"Error al procesar {filepath}: {actual_error}")
-                        logger.info(f"Emitiendo file_processed error para {filepath}") # Added logging
-                        self.file_processed.emit(filepath, f"Error: {actual_error}", True)
+                    callbacks.task_state_changed(task.id, TaskState.RUNNING)
+                    in_flight[executor.submit(task.func, *task.args)] = (task, filepath)
+
+                if not in_flight:
+                    if self.task_queue.circuit_breaker.is_open:
+                        if retry_count < max_retries:
+                            callbacks.circuit_breaker_opened()
+                            self._stop_event.wait(min(5000 * (retry_count + 1), 30000) / 1000)  # Backoff exponencial
+                            retry_count += 1
+                            continue
+                        else:
+                            logger.error("Máximo número de reintentos alcanzado")
+                            break
                     else:
-                        logger.debug(f"Tarea {task.id} completada exitosamente.") # Added logging
-                        self.task_queue.complete_task(task, result=result)
-                        logger.debug(f"Emitiendo task_state_changed COMPLETED para tarea {task.id}") # Added logging
-                        self.task_state_changed.emit(task.id, TaskState.COMPLETED)
+                        # Si no hay más tareas pero no hemos procesado todo, esperar brevemente
+                        if processed_count < len(file_paths):
+                            self._stop_event.wait(0.1)
+                            continue
+                        break
+
+                done, _ = wait(in_flight, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, filepath = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                        logger.debug(f"Tarea {task.id} ejecutada. Resultado: {result}") # Added logging
+                        actual_error = result.get("error")
+                        with self._thread_lock:
+                            if actual_error:
+                                logger.error(f"Tarea {task.id} fallida con error: {actual_error}") # Added logging
+                                self.task_queue.complete_task(task, error=actual_error)
+                                logger.debug(f"Emitiendo task_state_changed FAILED para tarea {task.id}") # Added logging
+                                callbacks.task_state_changed(task.id, TaskState.FAILED)
+                                logger.error(f"Error al procesar {filepath}: {actual_error}")
+                            else:
+                                logger.debug(f"Tarea {task.id} completada exitosamente.") # Added logging
+                                self.task_queue.complete_task(task, result=result)
+                                logger.debug(f"Emitiendo task_state_changed COMPLETED para tarea {task.id}") # Added logging
+                                callbacks.task_state_changed(task.id, TaskState.COMPLETED)
                 
-                # Determine message and error status based on result
-                message = ""
-                is_error = False
+                        # Determine message and error status based on result
+                        message = ""
+                        is_error = False
 
-                if actual_error:
-                    message = f"Error: {actual_error}"
-                    is_error = True
-                    error_count += 1 # Increment error_count here
-                elif "written" in result and result["written"]:
-                    # Metadata written successfully
-                    if "renamed" in result and result["renamed"]:
-                        # File was also renamed
-                        message = result.get("message", f"Renombrado a: {os.path.basename(result.get('new_filepath', ''))}")
-                        renamed_count += 1 # Increment renamed_count here
-                    else:
-                        # Metadata written, but file not renamed (either not requested or name was correct)
-                        message = result.get("message", "Metadatos actualizados.")
-                    success_count += 1 # Increment success_count here
-                    is_error = False
-                elif "written" in result and not result["written"]:
-                    # Metadata writing failed
-                    message = result.get('error', 'Error desconocido durante escritura de metadatos')
-                    is_error = True
-                    error_count += 1 # Increment error_count here
-                elif result.get("success") is False:
-                     # Catch other specific errors or failures not covered above
-                     message = result.get('message', result.get('error', 'Fallo desconocido durante el procesamiento'))
-                     is_error = True
-                     error_count += 1 # Increment error_count here
-                else:
-                    # Processing completed successfully
-                    genres = result.get("detected_genres", {}) or result.get("found_genres", {})
-                    if genres:
-                        genre_str = ", ".join(
-                            f"{g} ({c:.2f})" if isinstance(c, float) else f"{g}"
-                            for g, c in sorted(genres.items(), key=lambda x: x[1], reverse=True)
-                        )
-                        message = f"Procesamiento exitoso. Géneros: {genre_str}"
-                    else:
-                        message = result.get("message", "Procesamiento completado")
-                    success_count += 1 # Increment success_count here
-                    is_error = False
+                        if actual_error:
+                            message = f"Error: {actual_error}"
+                            is_error = True
+                            error_count += 1 # Increment error_count here
+                        elif "written" in result and result["written"]:
+                            # Metadata written successfully
+                            if "renamed" in result and result["renamed"]:
+                                # File was also renamed
+                                message = result.get("message", f"Renombrado a: {os.path.basename(result.get('new_filepath', ''))}")
+                                renamed_count += 1 # Increment renamed_count here
+                            else:
+                                # Metadata written, but file not renamed (either not requested or name was correct)
+                                message = result.get("message", "Metadatos actualizados.")
+                            success_count += 1 # Increment success_count here
+                            is_error = False
+                        elif "written" in result and not result["written"]:
+                            # Metadata writing failed
+                            message = result.get('error', 'Error desconocido durante escritura de metadatos')
+                            is_error = True
+                            error_count += 1 # Increment error_count here
+                        elif result.get("success") is False:
+                             # Catch other specific errors or failures not covered above
+                             message = result.get('message', result.get('error', 'Fallo desconocido durante el procesamiento'))
+                             is_error = True
+                             error_count += 1 # Increment error_count here
+                        else:
+                            # Processing completed successfully
+                            genres = result.get("detected_genres", {}) or result.get("found_genres", {})
+                            if genres:
+                                genre_str = ", ".join(
+                                    f"{g} ({c:.2f})" if isinstance(c, float) else f"{g}"
+                                    for g, c in sorted(genres.items(), key=lambda x: x[1], reverse=True)
+                                )
+                                message = f"Procesamiento exitoso. Géneros: {genre_str}"
+                            else:
+                                message = result.get("message", "Procesamiento completado")
+                            success_count += 1 # Increment success_count here
+                            is_error = False
 
-                # Emit the signal with the determined message and error status
-                self.file_processed.emit(filepath, message, is_error)
+                        # Emit the signal with the determined message and error status
+                        callbacks.file_processed(filepath, message, is_error)
 
-                # The signal circuit_breaker_closed is emitted in the success handler
-                if not self.task_queue.circuit_breaker.is_open and not is_error:
-                    self.circuit_breaker_closed.emit()
-                    logger.debug("Circuit breaker cerrado después de procesamiento exitoso")
+                        # The signal circuit_breaker_closed is emitted in the success handler
+                        if not self.task_queue.circuit_breaker.is_open and not is_error:
+                            callbacks.circuit_breaker_closed()
+                            logger.debug("Circuit breaker cerrado después de procesamiento exitoso")
 
-                processed_count += 1
-                total_files = len(self.file_paths)
-                self.progress.emit(f"Procesado: {processed_count}/{total_files} - {os.path.basename(filepath)}")
+                        processed_count += 1
+                        total_files = len(file_paths)
+                        callbacks.progress(f"Procesado: {processed_count}/{total_files} - {os.path.basename(filepath)}")
 
-                results_details.append({
-                    "filepath": filepath,
-                    "written_metadata_success": result.get("written", False),
-                    "current_genre": result.get("current_genre", ""),
-                    "selected_genres_written": result.get("selected_genres_written", []),
-                    "threshold_used": result.get("threshold_used", 0.3),
-                    "renamed_to": result.get("new_filepath", ""),
-                    "error": result.get("error", ""),
-                    "rename_error": result.get("error", ""), # Keep for compatibility with existing results_details structure
-                    "rename_message": result.get("message", ""), # Keep for compatibility
-                    "detected_genres_initial_clean": result.get("detected_genres_initial_clean", {}),
-                    "detected_genres_written": result.get("selected_genres_written", []),
-                    "tag_update_error": result.get("tag_update_error", "") # Keep for compatibility
-                })
-            except Exception as e:
-                logger.error(f"Excepción no manejada durante el procesamiento de tarea {task.id} para {filepath}: {str(e)}", exc_info=True) # Added logging with exc_info
-                with self._thread_lock:
-                    error_count += 1
-                    error_msg = f"Error: {str(e)}"
-                    logger.error(f"Error al procesar {filepath}: {str(e)}")
-                    self.task_queue.complete_task(task, error=error_msg)
-                    logger.debug(f"Emitiendo task_state_changed FAILED para tarea {task.id} debido a excepción no manejada.") # Added logging
-                    self.task_state_changed.emit(task.id, TaskState.FAILED)
-                    logger.info(f"Emitiendo file_processed error para {filepath} debido a excepción no manejada.") # Added logging
-                    self.file_processed.emit(filepath, error_msg, True)
+                        results_details.append({
+                            "filepath": filepath,
+                            "written_metadata_success": result.get("written", False),
+                            "current_genre": result.get("current_genre", ""),
+                            "selected_genres_written": result.get("selected_genres_written", []),
+                            "threshold_used": result.get("threshold_used", 0.3),
+                            "renamed_to": result.get("new_filepath", ""),
+                            "error": result.get("error", ""),
+                            "rename_error": result.get("error", ""), # Keep for compatibility with existing results_details structure
+                            "rename_message": result.get("message", ""), # Keep for compatibility
+                            "detected_genres_initial_clean": result.get("detected_genres_initial_clean", {}),
+                            "detected_genres_written": result.get("selected_genres_written", []),
+                            "tag_update_error": result.get("tag_update_error", "") # Keep for compatibility
+                        })
+                    except Exception as e:
+                        logger.error(f"Excepción no manejada durante el procesamiento de tarea {task.id} para {filepath}: {str(e)}", exc_info=True) # Added logging with exc_info
+                        with self._thread_lock:
+                            error_count += 1
+                            error_msg = f"Error: {str(e)}"
+                            logger.error(f"Error al procesar {filepath}: {str(e)}")
+                            self.task_queue.complete_task(task, error=error_msg)
+                            logger.debug(f"Emitiendo task_state_changed FAILED para tarea {task.id} debido a excepción no manejada.") # Added logging
+                            callbacks.task_state_changed(task.id, TaskState.FAILED)
+                            logger.info(f"Emitiendo file_processed error para {filepath} debido a excepción no manejada.") # Added logging
+                            callbacks.file_processed(filepath, error_msg, True)
+                        processed_count += 1
 
         try:
             logger.info("Limpiando tareas completadas.") # Added logging
@@ -269,13 +274,64 @@ class ProcessingThread(QThread):
                 logger.debug(f"Tareas activas después de limpieza: {len(self.task_queue._active_tasks)}") # Added logging
                 
             logger.info("Emitiendo finished signal.") # Added logging
-            self.finished.emit({
+            callbacks.finished({
                 "total": total_files,
                 "success": success_count,
                 "errors": error_count,
                 "renamed": renamed_count,
                 "details": results_details
             })
-            logger.info("ProcessingThread.run finalizado.") # Added logging
+            logger.info("Procesamiento de lote finalizado.") # Added logging
         except Exception as e:
             logger.error(f"Error finalizando el procesamiento: {str(e)}", exc_info=True) # Added logging with exc_info
+
+class ProcessingThread(QThread, _BatchWorker):
+    """Hilo para procesamiento asíncrono de archivos con cola de tareas."""
+    progress = Signal(str)
+    finished = Signal(dict)
+    file_processed = Signal(str, str, bool)  # filepath, message, is_error
+    task_state_changed = Signal(str, TaskState)  # task_id, new_state
+    circuit_breaker_opened = Signal()
+    circuit_breaker_closed = Signal()
+
+    def __init__(self, file_paths: List[str] = None, model: GenreModel = None,
+                 confidence: float = 0.3, max_genres: int = 3,
+                 rename_files: bool = False, backup_dir: Optional[str] = None,
+                 task_queue: Optional[TaskQueue] = None, parent=None):
+        super().__init__(parent)
+        from threading import Lock
+        self._thread_lock = Lock()
+        self.file_paths = file_paths if file_paths is not None else []
+        self.confidence = confidence
+        self.max_genres = max_genres
+        self.rename_files = rename_files
+        self.backup_dir = backup_dir
+        self.model = model
+        # Inicializar TaskQueue si no se proporciona una
+        self.task_queue = task_queue if task_queue is not None else TaskQueue()
+        self.is_running = True
+        self._stop_event = Event()
+        # Asegurar que el file_handler del modelo use el backup_dir proporcionado al thread.
+        if self.model and hasattr(self.model, 'detector') and self.model.detector and \
+           hasattr(self.model.detector, 'file_handler') and self.model.detector.file_handler:
+            if hasattr(self.model.detector.file_handler, 'set_backup_dir'):
+                current_fh_backup_dir = getattr(self.model.detector.file_handler, 'backup_dir', None)
+                new_thread_backup_path_obj = Path(self.backup_dir) if self.backup_dir else None
+                if current_fh_backup_dir != new_thread_backup_path_obj:
+                    self.model.detector.file_handler.set_backup_dir(self.backup_dir)
+                else:
+                    logger.debug(f"ProcessingThread: backup_dir ({self.backup_dir}) ya está configurado en file_handler.")
+            else:
+                logger.error("ProcessingThread: Mp3FileHandler en el modelo no tiene método 'set_backup_dir'. "
+                             "El respaldo podría no funcionar como se espera.")
+        else:
+            logger.error("ProcessingThread: No se pudo acceder a model.detector.file_handler. "
+                         "El respaldo podría no funcionar como se espera.")
+        self.is_running = True
+
+    def run(self):
+        """Ejecuta el procesamiento de archivos en segundo plano usando la cola de tareas."""
+        self._process_batch(self.file_paths, BatchCallbacks(
+            self.progress.emit, self.finished.emit, self.file_processed.emit,
+            self.task_state_changed.emit, self.circuit_breaker_opened.emit,
+            self.circuit_breaker_closed.emit))
@@ -2,6 +2,7 @@ import logging
 """Task queue implementation for async processing."""
 from typing import Callable, Any, List, Optional
 import queue
+import sys
 from queue import Queue
 import logging
 from dataclasses import dataclass
@@ -10,6 +11,9 @@ from threading import Lock
 
 logger = logging.getLogger(__name__)
 
+# slots=True solo existe desde Python 3.10; en versiones anteriores Task conserva __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class TaskState(Enum):
     """Estados posibles de una tarea."""
     PENDING = "pending"
@@ -18,7 +22,7 @@ class TaskState(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Task:
     """Representa una tarea en la cola."""
     id: str
@@ -138,4 +142,9 @@ class TaskQueue:
                 if task.id == task_id:
                     logger.debug(f"Estado de tarea {task_id}: {task.state}") # Added logging
                     return task.state
-        logger.debug(f"No se encontró tarea con id: {task_id}") # Added logging
\ No newline at end of file
+        logger.debug(f"No se encontró tarea con id: {task_id}") # Added logging
+
+    def snapshot_states(self) -> List[TaskState]:
+        """Devuelve los estados de todas las tareas activas tomando el lock una sola vez."""
+        with self._lock:
+            return [task.state for task in self._active_tasks]
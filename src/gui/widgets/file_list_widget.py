@@ -2,13 +2,13 @@
 from PySide6.QtWidgets import QListView, QAbstractItemView, QWidget, QScroller
 from PySide6.QtCore import Qt, Signal, QAbstractListModel, QModelIndex
 from PySide6.QtGui import QDragEnterEvent, QDropEvent
-from pathlib import Path
 import os
 import logging
 from typing import List, Optional, Dict, Set
 from collections import OrderedDict
 
 from ..i18n import tr
+from ...core.file_handler import find_mp3_files, path_key
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,8 @@ class FileListModel(QAbstractListModel):
     def __init__(self):
         super().__init__()
         self.file_paths: List[str] = []
+        # Claves normalizadas de file_paths para comprobar duplicados en O(1)
+        self.path_keys: Set[str] = set()
         self.displayed_paths: OrderedDict = OrderedDict()
         self.cache_size = 1000
         self.page_size = 100
@@ -45,7 +47,12 @@ class FileListModel(QAbstractListModel):
     
     def add_files(self, files: List[str]) -> int:
         """Añade archivos al modelo."""
-        new_files = [f for f in files if f.lower().endswith('.mp3') and f not in self.file_paths]
+        new_files = []
+        for f in files:
+            key = path_key(f)
+            if f.lower().endswith('.mp3') and key not in self.path_keys:
+                self.path_keys.add(key)
+                new_files.append(f)
         if not new_files:
             return 0
             
@@ -159,7 +166,7 @@ class FileListWidget(QListView):
             int: Cantidad de archivos añadidos
         """
         try:
-            files = [str(f) for f in Path(folder_path).rglob("*.mp3")]
+            files = find_mp3_files(folder_path)
             return self.add_files(files)
         except Exception as e:
             logger.error(f"Error processing folder {folder_path}: {e}")
@@ -188,6 +195,7 @@ class FileListWidget(QListView):
         """Clear the file list."""
         self.model.beginResetModel()
         self.model.file_paths.clear()
+        self.model.path_keys.clear()
         self.model.displayed_paths.clear()
         self.model.endResetModel()
         logger.debug("File list cleared")
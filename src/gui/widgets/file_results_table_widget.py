@@ -1,8 +1,10 @@
 from PySide6.QtWidgets import QTableWidget, QTableWidgetItem, QWidget, QAbstractItemView
 from PySide6.QtCore import Qt, Signal
-from typing import List, Optional
+from typing import List, Optional, Set
 import os
 
+from ...core.file_handler import find_mp3_files, path_key
+
 class FileResultsTableWidget(QTableWidget):
     """Tabla para mostrar archivos, estado y resultados."""
     files_added = Signal(int)  # Señal emitida cuando se añaden archivos
@@ -20,11 +22,13 @@ class FileResultsTableWidget(QTableWidget):
         self.setAlternatingRowColors(True)
         self.setMinimumHeight(200)
         self.file_paths_all: List[str] = []
+        # Claves normalizadas de file_paths_all para comprobar duplicados en O(1)
+        self._path_keys: Set[str] = set()
 
     def add_files(self, files: List[str]) -> int:
         added_count = 0
         for file_path in files:
-            if file_path.lower().endswith('.mp3') and file_path not in self.file_paths_all:
+            if file_path.lower().endswith('.mp3') and path_key(file_path) not in self._path_keys:
                 row = self.rowCount()
                 self.insertRow(row)
                 # Mostrar solo el nombre del archivo, pero guardar la ruta completa como data
@@ -35,17 +39,16 @@ class FileResultsTableWidget(QTableWidget):
                 self.setItem(row, self.COL_STATUS, QTableWidgetItem("Pendiente"))
                 self.setItem(row, self.COL_RESULT, QTableWidgetItem(""))
                 self.file_paths_all.append(file_path)
+                self._path_keys.add(path_key(file_path))
                 added_count += 1
         if added_count > 0:
             self.files_added.emit(added_count)
         return added_count
 
     def add_folder(self, folder_path: str) -> int:
-        from pathlib import Path
         added_count = 0
-        for file_path_obj in Path(folder_path).rglob("*.mp3"):
-            file_path = str(file_path_obj)
-            if file_path not in self.file_paths_all:
+        for file_path in find_mp3_files(folder_path):
+            if path_key(file_path) not in self._path_keys:
                 row = self.rowCount()
                 self.insertRow(row)
                 # Mostrar solo el nombre del archivo, pero guardar la ruta completa como data
@@ -56,6 +59,7 @@ class FileResultsTableWidget(QTableWidget):
                 self.setItem(row, self.COL_STATUS, QTableWidgetItem("Pendiente"))
                 self.setItem(row, self.COL_RESULT, QTableWidgetItem(""))
                 self.file_paths_all.append(file_path)
+                self._path_keys.add(path_key(file_path))
                 added_count += 1
         if added_count > 0:
             self.files_added.emit(added_count)
@@ -83,6 +87,7 @@ class FileResultsTableWidget(QTableWidget):
     def clear_table(self):
         self.setRowCount(0)
         self.file_paths_all.clear()
+        self._path_keys.clear()
 
     def get_selected_files(self) -> List[str]:
         selected_files = []
@@ -3,10 +3,70 @@ import os
 import shutil
 import pytest
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3, TIT2, TPE1, TCON
 
+class FakeClock:
+    """Reloj controlable para pruebas: solo avanza con advance() o sleep()."""
+
+    def __init__(self, start: float = 0.0):
+        self.t = start
+
+    def __call__(self) -> float:
+        return self.t
+
+    def advance(self, dt: float) -> None:
+        self.t += dt
+
+    def sleep(self, dt: float) -> None:
+        """Sustituto de time.sleep: avanza el reloj en lugar de bloquear."""
+        self.advance(dt)
+
+class RamTempPathFactory:
+    """Crea directorios temporales bajo una base en memoria (tmpfs) si existe."""
+
+    def __init__(self, base: Path):
+        self.base = base
+
+    def mktemp(self, basename: str) -> Path:
+        return Path(tempfile.mkdtemp(prefix=f"{basename}-", dir=self.base))
+
+@pytest.fixture(scope="session")
+def tmp_path_factory_ram(tmp_path_factory):
+    """Factory de directorios temporales en /dev/shm (Linux), sin E/S a disco.
+
+    Sin /dev/shm usa la base temporal normal de pytest.
+    """
+    shm = Path("/dev/shm")
+    if not (shm.is_dir() and os.access(shm, os.W_OK)):
+        yield RamTempPathFactory(tmp_path_factory.getbasetemp())
+        return
+    base = Path(tempfile.mkdtemp(prefix="mp3tag_tests_", dir=shm))
+    yield RamTempPathFactory(base)
+    shutil.rmtree(base, ignore_errors=True)
+
+@pytest.fixture
+def ram_tmp_path(tmp_path_factory_ram):
+    """Equivalente a tmp_path pero en memoria cuando es posible."""
+    return tmp_path_factory_ram.mktemp("test")
+
+@pytest.fixture(scope="session")
+def executor():
+    """Pool de hilos compartido por las pruebas concurrentes de la sesión.
+
+    Cada prueba debe esperar sus propios futures antes de terminar.
+    """
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown()
+
+@pytest.fixture
+def fake_clock():
+    """Provide a FakeClock to inject into time-dependent components."""
+    return FakeClock()
+
 @pytest.fixture(scope="session")
 def sample_mp3():
     """Use an existing MP3 file for testing."""
@@ -26,12 +86,10 @@ def valid_mp3(tmp_path, sample_mp3):
     shutil.copy2(sample_mp3, test_file)
     return str(test_file)
 
-@pytest.fixture
-def backup_dir(tmp_path):
-    """Create a backup directory."""
-    backup_dir = tmp_path / "backups"
-    backup_dir.mkdir()
-    return str(backup_dir)
+@pytest.fixture(scope="session")
+def backup_dir(tmp_path_factory):
+    """Create a backup directory shared by the whole session."""
+    return str(tmp_path_factory.mktemp("backups"))
 
 @pytest.fixture
 def mock_musicbrainz_api(monkeypatch):
@@ -47,6 +105,20 @@ def mock_musicbrainz_api(monkeypatch):
     monkeypatch.setattr(MusicBrainzAPI, "get_track_info", mock_get_track_info)
     return mock_get_track_info
 
+@pytest.fixture(scope="session")
+def music_api_classes():
+    """Import the music API classes once and share them across the session.
+
+    The import pulls in musicbrainzngs, pylast and requests, so test modules
+    request this fixture instead of importing the classes at module level.
+    """
+    from src.core.music_apis import MusicBrainzAPI, LastFmAPI, DiscogsAPI
+    return {
+        "musicbrainz": MusicBrainzAPI,
+        "lastfm": LastFmAPI,
+        "discogs": DiscogsAPI,
+    }
+
 @pytest.fixture(scope="session")
 def test_data_dir():
     """Create a temporary directory for test data that persists across tests."""
@@ -54,9 +126,13 @@ def test_data_dir():
     yield temp_dir
     shutil.rmtree(temp_dir)
 
-@pytest.fixture
-def mp3_collection(test_data_dir, valid_mp3):
-    """Create a collection of test MP3 files."""
+@pytest.fixture(scope="session")
+def mp3_collection(test_data_dir, sample_mp3):
+    """Create a collection of test MP3 files once per session.
+
+    The files are shared between tests: tests that need to modify or add
+    files must work on copies in their own ``tmp_path``.
+    """
     collection_dir = Path(test_data_dir) / "collection"
     collection_dir.mkdir(exist_ok=True)
     
@@ -64,7 +140,7 @@ def mp3_collection(test_data_dir, valid_mp3):
     files = []
     for i in range(3):
         dest = collection_dir / f"test_{i}.mp3"
-        shutil.copy(valid_mp3, dest)
+        shutil.copy(sample_mp3, dest)
         
         # Modify tags for each file
         tags = ID3(dest)
@@ -2,8 +2,12 @@
 import pytest
 from pathlib import Path
 import os
-from src.core.file_handler import Mp3FileHandler
+from datetime import datetime
+from types import SimpleNamespace
+from src.core.file_handler import Mp3FileHandler, find_mp3_files, path_key
 from src.core.genre_normalizer import GenreNormalizer
+from mutagen.easyid3 import EasyID3
+from tests.utils import create_minimal_mp3
 
 @pytest.fixture
 def file_handler(tmp_path):
@@ -143,6 +147,29 @@ class TestFileRenaming:
         assert result1["new_path"] != result2["new_path"]
         assert " (1)" in result2["new_path"]
 
+    def test_rename_never_overwrites_existing_target(self, file_handler, tmp_path, monkeypatch):
+        """Si el destino aparece tras la comprobación de conflictos, no se sobrescribe."""
+        taken = tmp_path / "Same Artist - Same Title.mp3"
+        taken.write_bytes(b"otro archivo")
+        source = tmp_path / "track.mp3"
+        assert create_minimal_mp3(source)
+        audio = EasyID3(str(source))
+        audio["artist"] = "Same Artist"
+        audio["title"] = "Same Title"
+        audio.save()
+        
+        # Simular que otro hilo ocupa el nombre entre la comprobación y el rename
+        real_exists = Path.exists
+        monkeypatch.setattr(Path, "exists", lambda self: self != taken and real_exists(self))
+        
+        result = file_handler.rename_file_by_genre(str(source), genres_to_write=["Rock"])
+        
+        assert result["success"] and "error" not in result
+        assert result["new_path"] == str(tmp_path / "Same Artist - Same Title (1).mp3")
+        assert taken.read_bytes() == b"otro archivo"
+        assert Path(result["new_path"]).stat().st_size > 0
+        assert not source.exists()
+
     def test_long_filename_handling(self, file_handler, sample_mp3):
         """Test handling of very long filenames."""
         very_long_artist = "A" * 100
@@ -162,3 +189,39 @@ class TestFileRenaming:
 
 if __name__ == "__main__":
     pytest.main([__file__])
+
+def test_backup_paths_unique_for_same_stem(file_handler, tmp_path, monkeypatch):
+    """Backups of same-named files taken at the same instant do not collide."""
+    frozen = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    monkeypatch.setattr("src.core.file_handler.datetime", SimpleNamespace(now=lambda: frozen))
+    first = file_handler._get_backup_path(str(tmp_path / "a" / "song.mp3"))
+    second = file_handler._get_backup_path(str(tmp_path / "b" / "song.mp3"))
+    
+    assert first != second
+    assert first.suffix == second.suffix == ".mp3"
+    assert first.name.startswith("song_backup_20240101120000123456_")
+
+def test_find_mp3_files_prunes_excluded_dirs(tmp_path):
+    """find_mp3_files recorre subcarpetas pero no entra en las excluidas."""
+    (tmp_path / "album").mkdir()
+    (tmp_path / "album" / "a.mp3").touch()
+    (tmp_path / "b.mp3").touch()
+    (tmp_path / "C.MP3").touch()
+    (tmp_path / "notes.txt").touch()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "c.mp3").touch()
+    
+    found = find_mp3_files(str(tmp_path))
+    
+    assert sorted(found) == sorted([
+        str(tmp_path / "album" / "a.mp3"), str(tmp_path / "b.mp3"), str(tmp_path / "C.MP3")
+    ])
+
+def test_path_key_normalizes_separators():
+    """Rutas equivalentes producen la misma clave de duplicado."""
+    assert path_key("music/./album//a.mp3") == path_key("music/album/a.mp3")
+
+def test_path_key_keeps_backslash_on_posix():
+    """La barra invertida solo es separador donde la plataforma la usa como tal."""
+    same = path_key("music\\a.mp3") == path_key("music/a.mp3")
+    assert same == ("\\" in (os.sep, os.altsep))
@@ -1,5 +1,8 @@
 """Test suite for genre detection and combination logic."""
+import shutil
 import pytest
+from src.core.file_handler import Mp3FileHandler
+from src.core.genre_detector import GenreDetector
 from src.core.genre_normalizer import GenreNormalizer
 from typing import Dict, List, Tuple
 
@@ -141,5 +144,23 @@ class TestGenreCombination:
             else:
                 assert normalized != expected
 
+class TestAnalyzeFiles:
+    """Test batch analysis of multiple files."""
+
+    def test_duplicate_tracks_query_apis_once(self, valid_mp3, tmp_path, backup_dir, mocker):
+        """Files with the same artist/title share a single API lookup."""
+        duplicate = tmp_path / "duplicate.mp3"
+        shutil.copy2(valid_mp3, duplicate)
+        api = mocker.Mock()
+        api.get_track_info.return_value = {"genres": ["Rock"], "year": "1990"}
+        detector = GenreDetector(apis=[api], file_handler=Mp3FileHandler(backup_dir=backup_dir))
+
+        results = detector.analyze_files([valid_mp3, str(duplicate)])
+
+        assert list(results) == [valid_mp3, str(duplicate)]
+        assert api.get_track_info.call_count == 1
+        assert results[str(duplicate)]["source"] == "cache"
+        assert results[str(duplicate)]["detected_genres"] == results[valid_mp3]["detected_genres"]
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -2,7 +2,7 @@
 import pytest
 from PySide6.QtTest import QTest
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtWidgets import QApplication, QPushButton, QWidget, QFileDialog
+from PySide6.QtWidgets import QApplication, QFileDialog
 from pathlib import Path
 from src.gui.main_window import MainWindow
 from src.gui.i18n import tr, set_language
@@ -14,7 +14,13 @@ class TestGUI:
         """Create main window instance."""
         window = MainWindow()
         qtbot.addWidget(window)  # Register window with qtbot for proper cleanup
+        return window
+        
+    @pytest.fixture
+    def visible_window(self, window, qtbot):
+        """Show the main window for tests that need it on screen (focus, shortcuts)."""
         window.show()
+        qtbot.waitExposed(window)
         return window
         
     @pytest.fixture(autouse=True)
@@ -42,22 +48,9 @@ class TestGUI:
         
     def test_keyboard_navigation(self, window):
         """Test keyboard navigation and focus handling."""
-        # Check tab order
-        # Find buttons by accessibleName, assuming they are set and unique
-        add_file_btn = None
-        add_folder_btn = None
-        for widget in window.findChildren(QPushButton):
-            if widget.accessibleName() == tr("accessibility_add_files"):
-                add_file_btn = widget
-            elif widget.accessibleName() == tr("accessibility_add_folder"):
-                add_folder_btn = widget
-        
-        assert add_file_btn is not None, "Add Files Button not found"
-        assert add_folder_btn is not None, "Add Folder Button not found"
-        
-        # Verify accessibility names
-        assert add_file_btn.accessibleName() == tr("accessibility_add_files")
-        assert add_folder_btn.accessibleName() == tr("accessibility_add_folder")
+        # Buttons are exposed as attributes, no need to walk the widget tree
+        assert window.add_files_btn.accessibleName() == tr("accessibility_add_files")
+        assert window.add_folder_btn.accessibleName() == tr("accessibility_add_folder")
         
     def test_file_list_interaction(self, window, tmp_path):
         """Test file list widget interaction."""
@@ -114,8 +107,9 @@ class TestGUI:
         pytest.param("Ctrl+Shift+O", "browse_folder_triggered", marks=pytest.mark.skip(reason="Debugging timeout issues")),
         pytest.param("Ctrl+P", "process_files_triggered", marks=pytest.mark.skip(reason="Debugging timeout issues"))
     ])
-    def test_keyboard_shortcuts(self, window, shortcut, expected_signal_name, qtbot, tmp_path, monkeypatch):
+    def test_keyboard_shortcuts(self, visible_window, shortcut, expected_signal_name, qtbot, tmp_path, monkeypatch):
         """Test keyboard shortcuts using qtbot.waitSignal."""
+        window = visible_window
         
         window.activateWindow() 
         window.raise_() 
@@ -133,9 +127,8 @@ class TestGUI:
         if expected_signal_name == "browse_folder_triggered":
             monkeypatch.setattr(QFileDialog, 'getExistingDirectory', lambda *args, **kwargs: str(tmp_path))
 
-        with qtbot.waitSignal(signal_to_wait, timeout=2000) as blocker: 
+        with qtbot.waitSignal(signal_to_wait, timeout=500) as blocker: 
             QTest.keySequence(window, shortcut)
-            QTest.qWait(100) 
             
     def test_drag_drop_support(self, window, tmp_path):
         """Test drag and drop functionality."""
@@ -144,12 +137,9 @@ class TestGUI:
     def test_accessibility_labels(self, window):
         """Test accessibility labels and descriptions."""
         # Check main sections
-        assert any(c.accessibleName() == "File Selection Section" 
-                  for c in window.findChildren(QWidget))
-        assert any(c.accessibleName() == "Options Section" 
-                  for c in window.findChildren(QWidget))
-        assert any(c.accessibleName() == "Results Section" 
-                  for c in window.findChildren(QWidget))
+        assert window.file_selection_section.accessibleName() == "File Selection Section"
+        assert window.options_section.accessibleName() == "Options Section"
+        assert window.results_section.accessibleName() == "Results Section"
                   
         # Check controls
         assert window.confidence_slider.accessibleDescription() == \
@@ -166,11 +156,8 @@ class TestGUI:
             
     def test_visual_feedback(self, window):
         """Test visual feedback for user actions."""
-        # Primero establecemos un estilo para los botones que refleje su estado
-        window.process_btn.setStyleSheet("""
-            QPushButton:enabled { background-color: #bb86fc; }
-            QPushButton:disabled { background-color: rgba(255,255,255,0.12); }
-        """)
+        # El estado del botón se comprueba por propiedad, sin re-aplicar QSS
+        assert not window.process_btn.isEnabled()
         
         # Test language switching visual feedback
         window.lang_selector.setCurrentIndex(1)  # Switch to Spanish
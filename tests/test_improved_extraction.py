@@ -4,6 +4,8 @@ import sys
 import logging
 from pathlib import Path
 
+import pytest
+
 # Configurar logging
 logging.basicConfig(level=logging.DEBUG,
                    format='%(asctime)s - %(levelname)s - %(message)s')
@@ -68,6 +70,48 @@ test_cases = [
     "X-Mix Club Classics####InvalidArtist@@@@"
 ]
 
+# Resultados esperados de extract_and_clean_metadata para cada caso
+EXPECTED = {
+    'Artist - Title': ('Artist', 'Title'),
+    'Artist - Title (Remix)': ('Artist', 'Title (remix)'),
+    'Artist - Title (Club Remix)': ('Artist', 'Title (club Remix)'),
+    'Artist - Title [Extended Mix]': ('Artist', 'Title [extended Mix]'),
+    'Artist - Title (Radio Edit)': ('Artist', 'Title (radio Edit)'),
+    'Artist - Title (feat. Other Artist)': ('Artist', 'Title (feat. Other Artist)'),
+    'Artist feat. Other Artist - Title': ('Artist feat. Other Artist', 'Title'),
+    'Artist ft. Other Artist - Title': ('Artist ft. Other Artist', 'Title'),
+    'Artist featuring Other Artist - Title': ('Artist Featuring Other Artist', 'Title'),
+    'Artist - Title (2023)': ('Artist', 'Title (2023)'),
+    'Artist - Title (Remix) [2023]': ('Artist', 'Title (remix) [2023]'),
+    'Artist - Title (feat. Other Artist) (Remix)': ('Artist', 'Title (feat. Other Artist) (remix)'),
+    '01. Calvin Harris - Summer (Calvin Harris & R3hab Remix)': ('Calvin Harris', 'Summer (calvin Harris & R3hab Remix)'),
+    'Avicii - Levels (Skrillex Remix) [HQ]': ('Avicii', 'Levels (skrillex Remix) [hq]'),
+    'DJ Snake ft. Justin Bieber - Let Me Love You': ('Dj Snake ft. Justin Bieber', 'Let Me Love You'),
+    'Daft Punk - Around The World (Official Video) [HD]': ('Daft. Punk', 'Around The World [hd]'),
+    '16-02 DJ Snake, Lil Jon - Turn Down For What (Original Mix)': ('02 Dj Snake, Lil Jon', 'Turn Down For What (original Mix)'),
+    "Dua Lipa - Don't Start Now [Official Music Video]": ('Dua Lipa', "Don't Start Now [official Music Video]"),
+    'Billie Jean - Michael Jackson': ('Billie Jean', 'Michael Jackson'),
+    'Thriller by Michael Jackson': ('Unknown Artist', 'Thriller by Michael Jackson'),
+    'Queen_Bohemian_Rhapsody': ('Queen', 'Bohemian_rhapsody'),
+    'The Beatles, The Rolling Stones - Come Together (Live)': ('The Beatles, The Rolling Stones', 'Come Together (live)'),
+    'Ultimate Remix Collection - Best of 80s': ('Ultimate Remix Collection', 'Best Of 80s'),
+    '01 - Track 1': ('Unknown Artist', 'Track 1'),
+    'Unknown Artist - Track 01': ('Unknown Artist', 'Track 01'),
+    'Viola Wills - Hot For You Ultimix By Les Massengale': ('Viola Wills', 'Hot For You Ultimix By Les Massengale'),
+    'Joan Jett - I Love Rock Roll Quantized - Super Short Edit': ('Joan Jett', 'I Love Rock Roll Quantized - Super Short Edit'),
+    'X-Mix Club Classics####InvalidArtist@@@@': ('Unknown Artist', 'X-mix Club Classics####invalidartist@@@@'),
+}
+
+def test_all_extractions():
+    """La extracción con patrones precompilados mantiene los resultados esperados."""
+    failures = []
+    for filename, expected in EXPECTED.items():
+        result = extract_and_clean_metadata(filename)
+        if result != expected:
+            failures.append(f"{filename!r}: esperado {expected!r}, obtenido {result!r}")
+    if failures:
+        pytest.fail("\n".join(failures))
+
 def main():
     """Ejecuta los casos de prueba."""
     print("PRUEBA DE EXTRACCIÓN MEJORADA DE METADATOS")
@@ -1,12 +1,10 @@
 """Tests for API metrics tracking."""
 import pytest
-import time
 from pathlib import Path
 import tempfile
 import json
 from typing import Dict, Any
 
-from src.core.music_apis import MusicBrainzAPI, LastFmAPI, DiscogsAPI
 from src.core.api_metrics import MetricsTracker
 
 @pytest.fixture
@@ -20,23 +18,30 @@ def tracker(metrics_file):
     """Create metrics tracker instance."""
     return MetricsTracker(metrics_file)
 
-@pytest.fixture
-def apis(mocker):
-    """Create API instances with mocked external calls."""
+@pytest.fixture(scope="module")
+def apis(module_mocker, music_api_classes):
+    """Create API instances with mocked external calls, shared by the module."""
     # Mock MusicBrainz
-    mocker.patch('musicbrainzngs.search_recordings', return_value={"recording-list": []})
-    mb_api = MusicBrainzAPI()
+    module_mocker.patch('musicbrainzngs.search_recordings', return_value={"recording-list": []})
+    mb_api = music_api_classes["musicbrainz"]()
     
     # Mock Last.fm
-    mocker.patch('pylast.LastFMNetwork')
-    lastfm_api = LastFmAPI()
+    module_mocker.patch('pylast.LastFMNetwork')
+    lastfm_api = music_api_classes["lastfm"]()
     
     # Mock Discogs
-    mocker.patch('requests.get')
-    discogs_api = DiscogsAPI()
+    module_mocker.patch('requests.get')
+    discogs_api = music_api_classes["discogs"]()
     
     return {"musicbrainz": mb_api, "lastfm": lastfm_api, "discogs": discogs_api}
 
+@pytest.fixture(autouse=True)
+def reset_api_metrics(apis):
+    """Start every test with clean metrics on the shared API instances."""
+    for api in apis.values():
+        api.reset_metrics()
+    yield
+
 def test_metrics_recording(apis, tracker):
     """Test recording of API call metrics."""
     # Make API calls and verify metrics
@@ -88,7 +93,7 @@ def test_error_tracking(apis, tracker, mocker):
     # Mock API error
     mock_network = mocker.MagicMock()
     mock_network.get_track.side_effect = Exception("API Error")
-    lastfm_api.network = mock_network
+    mocker.patch.object(lastfm_api, "network", mock_network)
     
     # Make failing call
     lastfm_api.get_track_info("Artist", "Track")
@@ -98,16 +103,17 @@ def test_error_tracking(apis, tracker, mocker):
     assert metrics["total_calls"] == 1
     assert metrics["rate_limit_ratio"] == 0.0  # No rate limit hit
 
-def test_latency_tracking(apis, tracker):
+def test_latency_tracking(apis, tracker, mocker):
     """Test tracking of API call latencies."""
     discogs_api = apis["discogs"]
+    mocker.patch.object(discogs_api, "_request_discogs", return_value=None)
     
-    # Make API call with artificial delay
-    time.sleep(0.1)  # Add 100ms delay
+    # Controlled clock: the call starts at 0.0 and is recorded at 0.1
+    mocker.patch("src.core.music_apis.perf_counter", side_effect=[0.0, 0.1])
     discogs_api.get_track_info("Artist", "Track")
     
     metrics = discogs_api.get_metrics()
-    assert metrics["avg_latency"] >= 0.1  # Should include our delay
+    assert metrics["avg_latency"] == pytest.approx(0.1)
 
 def test_multi_api_tracking(apis, tracker):
     """Test tracking metrics for multiple APIs."""
@@ -1,66 +1,183 @@
 """Pruebas unitarias para el sistema de caché persistente."""
+import itertools
 import os
+import secrets
+import sqlite3
 import time
 import pytest
 from pathlib import Path
+from uuid import uuid4
+from src.core import persistent_cache
 from src.core.persistent_cache import PersistentCache
 
-@pytest.fixture
-def cache_dir(tmp_path):
-    """Fixture que proporciona un directorio temporal para las pruebas."""
-    cache_path = tmp_path / "test_cache"
-    return str(cache_path)
+# Pool aleatorio compartido: las pruebas de concurrencia miden el caché, no random.choices
+_RAND_POOL = secrets.token_hex(65536)
+_RAND_OFFSET = itertools.count()
 
-@pytest.fixture
-def cache(cache_dir):
-    """Fixture que proporciona una instancia de caché para las pruebas."""
-    ttl_policy = {
-        "api_response": 7200,  # 2 horas
-        "metadata": 86400,     # 24 horas
-        "thumbnails": 3600     # 1 hora
-    }
+TTL_POLICY = {
+    "api_response": 7200,  # 2 horas
+    "metadata": 86400,     # 24 horas
+    "thumbnails": 3600     # 1 hora
+}
+
+def make_cache(cache_dir, clock=time.time, max_size_bytes=5 * 1024 * 1024):
+    """Crea un caché con la configuración común de las pruebas."""
     return PersistentCache(
         cache_dir=cache_dir,
         default_ttl=3600,
-        max_size_bytes=5 * 1024 * 1024,  # 5MB
+        max_size_bytes=max_size_bytes,  # 5MB por defecto
         compression_threshold=512,
-        ttl_policy=ttl_policy
+        ttl_policy=TTL_POLICY,
+        clock=clock
     )
 
-def test_basic_cache_operations(cache):
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory_ram):
+    """Directorio temporal (en memoria si es posible) compartido por el módulo."""
+    return str(tmp_path_factory_ram.mktemp("test_cache"))
+
+@pytest.fixture(scope="module")
+def cache(cache_dir):
+    """Caché compartido por el módulo; cada prueba aísla sus claves con `prefix`."""
+    cache = make_cache(cache_dir)
+    yield cache
+    cache.close()
+
+@pytest.fixture(autouse=True)
+def prefix(cache):
+    """Prefijo de claves único por prueba; sus entradas se eliminan al terminar."""
+    prefix = f"t{uuid4().hex}_"
+    yield prefix
+    cache.delete_prefix(prefix)
+
+@pytest.fixture
+def fresh_cache(request, ram_tmp_path, fake_clock):
+    """Caché en un directorio nuevo, para pruebas que cambian su configuración o
+    dependen de estadísticas globales.
+
+    Con parametrización indirecta, el parámetro es el max_size_bytes del caché.
+    """
+    max_size_bytes = getattr(request, "param", 5 * 1024 * 1024)
+    return make_cache(str(ram_tmp_path / "test_cache"), clock=fake_clock,
+                      max_size_bytes=max_size_bytes)
+
+def test_basic_cache_operations(cache, prefix):
     """Prueba operaciones básicas del caché."""
+    key = prefix + "test_key"
     # Prueba set/get
-    cache.set("test_key", "test_value")
-    assert cache.get("test_key") == "test_value"
+    cache.set(key, "test_value")
+    assert cache.get(key) == "test_value"
     
     # Prueba delete
-    cache.delete("test_key")
-    assert cache.get("test_key") is None
+    cache.delete(key)
+    assert cache.get(key) is None
+
+def test_delete_prefix(cache, prefix):
+    """delete_prefix elimina solo las claves con ese prefijo."""
+    cache.set(prefix + "a", "1")
+    cache.set(prefix + "b", "2")
+    cache.set(prefix[:-1] + "other", "3")
+    
+    assert cache.delete_prefix(prefix) == 2
+    assert cache.get(prefix + "a") is None
+    assert cache.get(prefix + "b") is None
+    assert cache.get(prefix[:-1] + "other") == "3"
+    cache.delete(prefix[:-1] + "other")
+
+def test_delete_prefix_max_code_point(cache, prefix):
+    """delete_prefix acepta prefijos que terminan en U+10FFFF o llevan comodines."""
+    cache.set(prefix + "\U0010ffff" + "a", "1")
+    cache.set(prefix + "*[?]", "2")
+    cache.set(prefix[:-1] + "other", "3")
+    
+    assert cache.delete_prefix(prefix + "\U0010ffff") == 1
+    assert cache.delete_prefix(prefix + "*[") == 1
+    assert cache.get(prefix + "\U0010ffff" + "a") is None
+    assert cache.get(prefix + "*[?]") is None
+    assert cache.get(prefix[:-1] + "other") == "3"
+    cache.delete(prefix[:-1] + "other")
 
-def test_ttl_expiration(cache):
+def test_set_many(cache, prefix):
+    """set_many guarda todas las entradas en un solo lote."""
+    before = cache.get_stats()["entries"]
+    items = {f"{prefix}bulk_{i}": f"value_{i}" for i in range(10)}
+    cache.set_many(items, "metadata")
+    
+    assert cache.get_stats()["entries"] - before == 10
+    for key, value in items.items():
+        assert cache.get(key) == value
+
+def test_hashed_key_operations(ram_tmp_path):
+    """get_b/set_b usan claves hasheadas de 16 bytes que persisten entre instancias."""
+    cache_dir = str(ram_tmp_path / "test_cache")
+    cache = PersistentCache(cache_dir)
+    key_hash = PersistentCache.hash_key("x" * 1000)
+    assert len(key_hash) == 16
+    
+    cache.set_b(key_hash, "value")
+    assert cache.get_b(key_hash) == "value"
+    assert cache.get("x" * 1000) is None
+    assert PersistentCache(cache_dir).get_b(key_hash) == "value"
+    
+    with pytest.raises(TypeError):
+        cache.get_b(b"short")
+
+def test_ttl_expiration(fresh_cache, fake_clock):
     """Prueba la expiración por TTL."""
+    cache = fresh_cache
     # Configurar TTL corto para la prueba
     cache._default_ttl = 1
     
     cache.set("expire_key", "expire_value")
     assert cache.get("expire_key") == "expire_value"
     
-    # Esperar a que expire
-    time.sleep(1.1)
+    # Avanzar el reloj hasta que expire
+    fake_clock.advance(1.1)
     assert cache.get("expire_key") is None
 
-def test_ttl_policy(cache):
+def test_janitor_purges_expired_entries(ram_tmp_path):
+    """El janitor elimina entradas expiradas sin que nadie las lea."""
+    cache = PersistentCache(str(ram_tmp_path), cleanup_interval=0.05)
+    try:
+        cache.set("expired_key", "value", ttl=0)
+        
+        deadline = time.time() + 2
+        while cache.get_stats()["entries"] and time.time() < deadline:
+            time.sleep(0.05)
+        
+        stats = cache.get_stats()
+        assert stats["entries"] == 0
+        assert stats["evictions"] == 1
+    finally:
+        cache.close()
+
+def test_close_closes_every_thread_connection(ram_tmp_path, executor):
+    """close() detiene el janitor y cierra también las conexiones de otros hilos."""
+    cache = PersistentCache(str(ram_tmp_path), cleanup_interval=0.05)
+    cache.set("key", "value")
+    worker_db = executor.submit(lambda: (cache.get("key"), cache._db)[1]).result()
+    time.sleep(0.1)  # Dejar que el janitor abra su propia conexión
+    
+    cache.close()
+    
+    assert not cache._janitor.is_alive()
+    with pytest.raises(sqlite3.ProgrammingError):
+        worker_db.execute("SELECT 1")
+    assert len(cache._connections) == 0
+
+def test_ttl_policy(cache, prefix):
     """Prueba políticas de TTL por tipo de dato."""
     # Guardar con diferentes tipos
-    cache.set("api_key", "api_data", "api_response")
-    cache.set("meta_key", "meta_data", "metadata")
+    cache.set(prefix + "api_key", "api_data", "api_response")
+    cache.set(prefix + "meta_key", "meta_data", "metadata")
     
     # Verificar que los datos persisten según su política
-    assert cache.get("api_key") == "api_data"
-    assert cache.get("meta_key") == "meta_data"
+    assert cache.get(prefix + "api_key") == "api_data"
+    assert cache.get(prefix + "meta_key") == "meta_data"
 
-def test_size_limit_and_lru(cache):
+def test_size_limit_and_lru(fresh_cache):
     """Prueba límites de tamaño y política LRU."""
+    cache = fresh_cache
     # Configurar límite pequeño para la prueba
     cache._max_size_bytes = 1024  # 1KB
     
@@ -75,45 +192,143 @@ def test_size_limit_and_lru(cache):
     assert cache.get("data2") == large_data
     assert cache.get("data3") == large_data
 
-def test_compression(cache):
+def test_lru_refreshed_on_get(fresh_cache):
+    """Leer una entrada la marca como reciente y se expulsa la siguiente."""
+    cache = fresh_cache
+    cache._max_size_bytes = 1024  # 1KB
+    
+    data = "x" * 400
+    cache.set("data1", data)
+    cache.set("data2", data)
+    assert cache.get("data1") == data
+    cache.set("data3", data)
+    
+    assert cache.get("data2") is None
+    assert cache.get("data1") == data
+    assert cache.get("data3") == data
+
+@pytest.mark.parametrize("eviction", ["lru", "counter"])
+def test_size_limit_eviction_policies(ram_tmp_path, eviction):
+    """Sin lecturas, ambas políticas expulsan primero la entrada más antigua."""
+    cache = PersistentCache(str(ram_tmp_path), max_size_bytes=1024, eviction=eviction)
+    
+    large_data = "x" * 512
+    cache.set("data1", large_data)
+    cache.set("data2", large_data)
+    cache.set("data3", large_data)
+    
+    assert cache.get("data1") is None
+    assert cache.get("data2") == large_data
+    assert cache.get("data3") == large_data
+
+def test_counter_eviction_keeps_frequent_entries(ram_tmp_path):
+    """En modo counter se expulsa la entrada con menos accesos."""
+    cache = PersistentCache(str(ram_tmp_path), max_size_bytes=1024, eviction="counter")
+    
+    data = "x" * 400
+    cache.set("frequent", data)
+    cache.set("rare", data)
+    for _ in range(3):
+        assert cache.get("frequent") == data
+    cache.set("new", data)
+    
+    assert cache.get("rare") is None
+    assert cache.get("frequent") == data
+
+def test_counter_saturation_halves_every_shard(ram_tmp_path, monkeypatch):
+    """Al saturarse un contador se dividen los de todos los shards, no solo el suyo."""
+    monkeypatch.setattr(persistent_cache, "_COUNTER_LIMIT", 8)
+    cache = PersistentCache(str(ram_tmp_path), eviction="counter")
+    hot = "hot"
+    cold = next(f"cold_{i}" for i in itertools.count()
+                if cache._shard_for(f"cold_{i}") != cache._shard_for(hot))
+    cache.set(hot, "1")
+    cache.set(cold, "2")
+    for _ in range(5):
+        cache.get(cold)
+    for _ in range(7):
+        cache.get(hot)
+    
+    # hot llegó a 8 accesos: hot pasa a 4 y cold (6 accesos, otro shard) a 3
+    assert cache._shards[cache._shard_for(hot)][hot][2] == 4
+    assert cache._shards[cache._shard_for(cold)][cold][2] == 3
+
+def test_invalid_eviction_policy(ram_tmp_path):
+    """Una política de expulsión desconocida se rechaza."""
+    with pytest.raises(ValueError):
+        PersistentCache(str(ram_tmp_path), eviction="fifo")
+
+def test_compression(cache, prefix):
     """Prueba compresión de datos."""
+    savings_before = cache.get_stats()["compression_savings"]
     # Datos que superan el umbral de compresión
     large_data = "test_data" * 100
-    cache.set("compressed_key", large_data)
+    cache.set(prefix + "compressed_key", large_data)
     
     # Verificar que los datos se recuperan correctamente
-    assert cache.get("compressed_key") == large_data
+    assert cache.get(prefix + "compressed_key") == large_data
     
     # Verificar que hubo ahorro por compresión
     stats = cache.get_stats()
-    assert stats["compression_savings"] > 0
+    assert stats["compression_savings"] > savings_before
+
+def test_compression_level(ram_tmp_path):
+    """Un nivel de compresión explícito se aplica al comprimir y se lee de vuelta."""
+    cache = PersistentCache(str(ram_tmp_path), compression_threshold=512, compression_level=1)
+    large_data = "test_data" * 100
+    cache.set("compressed_key", large_data)
+    
+    assert cache.get("compressed_key") == large_data
+    assert cache.get_stats()["compression_savings"] > 0
 
-def test_stats_tracking(cache):
+def test_invalid_compression_level(ram_tmp_path):
+    """Un nivel que el códec no acepta se rechaza al crear el caché."""
+    with pytest.raises(ValueError):
+        PersistentCache(str(ram_tmp_path), compression_level=100)
+
+def test_positional_arguments_keep_original_order(ram_tmp_path):
+    """Los argumentos posicionales originales no se desplazan; los nuevos son por nombre."""
+    cache = PersistentCache(str(ram_tmp_path), 60, 1024, 512, {"metadata": 10}, 120)
+    assert cache._ttl_policy == {"metadata": 10}
+    assert cache._cleanup_interval == 120
+    with pytest.raises(TypeError):
+        PersistentCache(str(ram_tmp_path), 60, 1024, 512, None, 120, 1)
+    cache.close()
+
+def test_incompressible_data(cache, prefix):
+    """Los datos que no se reducen al comprimir se guardan sin comprimir."""
+    savings_before = cache.get_stats()["compression_savings"]
+    random_data = os.urandom(2048)
+    cache.set(prefix + "random_key", random_data)
+    
+    assert cache.get(prefix + "random_key") == random_data
+    assert cache.get_stats()["compression_savings"] == savings_before
+
+def test_stats_tracking(cache, prefix):
     """Prueba seguimiento de estadísticas."""
+    before = cache.get_stats()
     # Generar algunas operaciones
-    cache.set("stats_key1", "value1")
-    cache.set("stats_key2", "value2")
-    cache.get("stats_key1")
-    cache.get("nonexistent_key")
+    cache.set(prefix + "stats_key1", "value1")
+    cache.set(prefix + "stats_key2", "value2")
+    cache.get(prefix + "stats_key1")
+    cache.get(prefix + "nonexistent_key")
     
-    # Verificar estadísticas
+    # Verificar estadísticas (como incrementos sobre el caché compartido)
     stats = cache.get_stats()
-    assert stats["hits"] == 1
-    assert stats["misses"] == 1
-    assert stats["entries"] == 2
-    assert stats["current_size"] > 0
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["entries"] - before["entries"] == 2
+    assert stats["current_size"] > before["current_size"]
+
+def random_string(length):
+    """Devuelve un trozo del pool aleatorio precalculado (sin generar aleatorios por llamada)."""
+    start = (next(_RAND_OFFSET) * length) & 0xFFFF
+    return _RAND_POOL[start:start + length]
 
-def test_concurrent_access(cache):
+def test_concurrent_access(cache, prefix, executor):
     """Prueba acceso concurrente al caché."""
-    from concurrent.futures import ThreadPoolExecutor
-    import random
-    import string
-    
-    def random_string(length):
-        return ''.join(random.choices(string.ascii_letters, k=length))
-    
     def worker():
-        key = random_string(10)
+        key = prefix + random_string(10)
         value = random_string(100)
         cache.set(key, value)
         assert cache.get(key) == value
@@ -121,13 +336,13 @@ def test_concurrent_access(cache):
         assert cache.get(key) is None
     
     # Ejecutar operaciones concurrentes
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(worker) for _ in range(10)]
-        for future in futures:
-            future.result()
+    futures = [executor.submit(worker) for _ in range(10)]
+    for future in futures:
+        future.result()
 
-def test_cache_persistence(cache_dir):
+def test_cache_persistence(tmp_path):
     """Prueba persistencia del caché entre reinicios."""
+    cache_dir = str(tmp_path / "test_cache")
     # Crear primera instancia y guardar datos
     cache1 = PersistentCache(cache_dir)
     cache1.set("persist_key", "persist_value")
@@ -136,93 +351,119 @@ def test_cache_persistence(cache_dir):
     cache2 = PersistentCache(cache_dir)
     assert cache2.get("persist_key") == "persist_value"
 
-def test_invalid_data_handling(cache):
+def _row_count(cache, key):
+    """Número de filas de la base de datos del caché para una clave."""
+    return cache._db.execute("SELECT COUNT(*) FROM entries WHERE key = ?", (key,)).fetchone()[0]
+
+def test_invalid_data_handling(cache, prefix):
     """Prueba manejo de datos inválidos."""
-    # Intentar guardar tipos no serializables
-    with pytest.raises(TypeError):
-        cache.set("invalid_key", lambda x: x)
+    # Los tipos no serializables se registran y se ignoran, sin lanzar excepción
+    cache.set(prefix + "invalid_key", lambda x: x)
+    assert cache.get(prefix + "invalid_key") is None
+    assert _row_count(cache, prefix + "invalid_key") == 0
     
-    # Crear archivo de caché corrupto
-    cache_path = Path(cache._cache_dir) / "corrupt.json"
-    cache_path.write_text("invalid json")
+    # Corromper el JSON guardado en la fila
+    key = prefix + "corrupt"
+    cache.set(key, {"genres": ["Rock"]})
+    cache._db.execute("UPDATE entries SET value = ? WHERE key = ?", (b"invalid json", key))
     
-    # Verificar que se maneja correctamente
-    assert cache.get("corrupt") is None
+    # Verificar que se maneja correctamente y la fila se descarta
+    assert cache.get(key) is None
+    assert _row_count(cache, key) == 0
+
+def test_corrupt_database_recovery(ram_tmp_path):
+    """Una base de datos corrupta se recrea vacía al abrir el caché."""
+    cache_dir = str(ram_tmp_path / "test_cache")
+    Path(cache_dir).mkdir(parents=True)
+    (Path(cache_dir) / "cache.sqlite3").write_bytes(b"not a database" * 100)
+    
+    cache = PersistentCache(cache_dir)
+    assert cache.get("any_key") is None
+    cache.set("any_key", "value")
+    assert cache.get("any_key") == "value"
 
 # Nuevas pruebas añadidas para mejorar cobertura
 
-def test_edge_cases(cache):
+def test_edge_cases(cache, prefix):
     """Prueba casos límite."""
     # Clave muy larga
-    long_key = "x" * 1000
+    long_key = prefix + "x" * 1000
     cache.set(long_key, "value")
     assert cache.get(long_key) == "value"
     
     # Valor nulo
-    cache.set("null_key", None)
-    assert cache.get("null_key") is None
+    cache.set(prefix + "null_key", None)
+    assert cache.get(prefix + "null_key") is None
     
     # Valor muy grande (cercano al límite)
     large_value = "x" * (5 * 1024 * 1024 - 1000)  # Casi 5MB
-    cache.set("large_key", large_value)
-    assert cache.get("large_key") == large_value
+    cache.set(prefix + "large_key", large_value)
+    assert cache.get(prefix + "large_key") == large_value
 
-def test_ttl_edge_cases(cache):
+def test_ttl_edge_cases(cache, prefix):
     """Prueba casos límite de TTL."""
     # TTL de 0 (expiración inmediata)
-    cache.set("zero_ttl", "value", ttl=0)
-    assert cache.get("zero_ttl") is None
+    cache.set(prefix + "zero_ttl", "value", ttl=0)
+    assert cache.get(prefix + "zero_ttl") is None
     
     # TTL negativo (debería usar el default)
-    cache.set("negative_ttl", "value", ttl=-1)
-    assert cache.get("negative_ttl") == "value"
+    cache.set(prefix + "negative_ttl", "value", ttl=-1)
+    assert cache.get(prefix + "negative_ttl") == "value"
     
     # TTL muy grande
-    cache.set("large_ttl", "value", ttl=1000000000)
-    assert cache.get("large_ttl") == "value"
+    cache.set(prefix + "large_ttl", "value", ttl=1000000000)
+    assert cache.get(prefix + "large_ttl") == "value"
 
-def test_error_recovery(cache, cache_dir):
+def test_error_recovery(fresh_cache):
     """Prueba recuperación de errores."""
-    # Simular error de permisos
-    os.chmod(cache_dir, 0o000)
-    try:
-        with pytest.raises(IOError):
-            cache.set("permission_key", "value")
-    finally:
-        os.chmod(cache_dir, 0o755)
+    cache = fresh_cache
+    # Marcar como comprimida una entrada que no lo está
+    cache.set("flag_key", "value")
+    cache._db.execute("UPDATE entries SET compressed = 1 WHERE key = ?", ("flag_key",))
+    assert cache.get("flag_key") is None
+    assert _row_count(cache, "flag_key") == 0
+    
+    # Texto guardado con bytes que no son UTF-8 válido
+    cache.set("text_key", "value")
+    cache._db.execute("UPDATE entries SET value = ? WHERE key = ?", (b"\xff\xfe", "text_key"))
+    assert cache.get("text_key") is None
+    assert _row_count(cache, "text_key") == 0
     
-    # Simular archivo corrupto con JSON parcial
-    cache_file = Path(cache._cache_dir) / "partial.json"
-    cache_file.write_text('{"key": "value", "corrupted')
-    assert cache.get("partial") is None
+    # Las entradas descartadas ya no cuentan en el tamaño y el caché sigue operativo
+    assert cache._current_size == 0
+    cache.set("after_key", "value")
+    assert cache.get("after_key") == "value"
     
-    # Simular error de espacio en disco
+    # Un valor mayor que el límite no se conserva ni rompe el límite de tamaño
     huge_value = "x" * (cache._max_size_bytes + 1)
-    with pytest.raises(ValueError):
-        cache.set("huge_key", huge_value)
+    cache.set("huge_key", huge_value)
+    assert cache.get("huge_key") is None
+    assert cache._current_size <= cache._max_size_bytes
 
-def test_cleanup_policy(cache):
+@pytest.mark.parametrize("fresh_cache", [500], indirect=True)
+def test_cleanup_policy(fresh_cache):
     """Prueba políticas de limpieza."""
-    # Llenar el caché hasta el límite
+    cache = fresh_cache
+    # Llenar el caché muy por encima del límite (5 entradas de 100 bytes)
     small_data = "x" * 100
-    for i in range(100):
-        cache.set(f"key_{i}", small_data)
+    cache.set_many({f"key_{i}": small_data for i in range(100)})
     
     # Verificar que se eliminaron las entradas más antiguas
     assert cache.get("key_0") is None
+    assert cache.get("key_94") is None
     
     # Verificar que las entradas más recientes permanecen
-    assert cache.get(f"key_99") == small_data
+    assert cache.get("key_95") == small_data
+    assert cache.get("key_99") == small_data
     
     # Forzar limpieza explícita
     cache.cleanup()
     stats = cache.get_stats()
+    assert stats["evictions"] == 95
     assert stats["current_size"] <= cache._max_size_bytes
 
-def test_concurrent_error_handling(cache):
+def test_concurrent_error_handling(cache, executor):
     """Prueba manejo de errores concurrentes."""
-    from concurrent.futures import ThreadPoolExecutor
-    
     def error_worker():
         try:
             # Intentar operaciones que pueden fallar
@@ -233,7 +474,6 @@ def test_concurrent_error_handling(cache):
             assert isinstance(e, (TypeError, ValueError))
     
     # Ejecutar operaciones de error concurrentemente
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(error_worker) for _ in range(5)]
-        for future in futures:
-            future.result()
\ No newline at end of file
+    futures = [executor.submit(error_worker) for _ in range(5)]
+    for future in futures:
+        future.result()
\ No newline at end of file
@@ -1,28 +1,96 @@
 """Pruebas unitarias para ProcessingThread."""
 import pytest
 import os
+import time
 from pathlib import Path
+from threading import Event, Lock
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 from PySide6.QtCore import QThread
-from src.gui.threads.processing_thread import ProcessingThread
-from src.gui.threads.task_queue import TaskState
+from src.gui.threads.processing_thread import ProcessingThread, BatchCallbacks, _BatchWorker
+from src.gui.threads.task_queue import TaskQueue, TaskState
 from src.gui.models.genre_model import GenreModel
 
+# Directorio con archivos MP3 reales para test_real_mp3_processing
+MP3_DIR = os.environ.get(
+    "TEST_MP3_DIR",
+    "/Volumes/My Passport/Dj compilation 2025/DMS/Mayo25/X-Mix Club Classics/"
+    "X-MIX CLUB CLASSICS BEST OF 320 (Seperated Tracks)"
+)
+
+class FakeFileHandler:
+    """Doble de Mp3FileHandler que registra las llamadas a set_backup_dir."""
+
+    def __init__(self):
+        self.backup_dir = None
+        self.backup_dir_calls = []
+
+    def set_backup_dir(self, backup_dir):
+        self.backup_dir_calls.append(backup_dir)
+
+class FakeGenreModel:
+    """Doble de GenreModel: devuelve resultados fijos y registra las llamadas.
+
+    Si `error` no es None, process lo lanza; `delay` simula trabajo de E/S.
+    """
+
+    def __init__(self, process_result=None, error=None, delay=0.0, file_handler=None):
+        self.process_result = process_result
+        self.error = error
+        self.delay = delay
+        self.process_calls = []
+        if file_handler is not None:
+            self.detector = SimpleNamespace(file_handler=file_handler)
+
+    def process(self, filepath, *args, **kwargs):
+        self.process_calls.append(filepath)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.process_result
+
+class _Harness(_BatchWorker):
+    """Ejecuta `_process_batch` sin QThread y registra cada evento en listas."""
+
+    def __init__(self, file_paths, model, confidence=0.3, max_genres=3, rename_files=False):
+        self.file_paths = file_paths
+        self.model = model
+        self.confidence = confidence
+        self.max_genres = max_genres
+        self.rename_files = rename_files
+        self.task_queue = TaskQueue()
+        self.is_running = True
+        self._stop_event = Event()
+        self._thread_lock = Lock()
+        self.progress = []
+        self.finished = []
+        self.file_processed = []
+        self.task_state_changed = []
+        self.circuit_breaker_opened = []
+        self.circuit_breaker_closed = []
+
+    def run(self):
+        self._process_batch(self.file_paths, BatchCallbacks(
+            progress=self.progress.append,
+            finished=self.finished.append,
+            file_processed=lambda fp, msg, error: self.file_processed.append((fp, msg, error)),
+            task_state_changed=lambda tid, state: self.task_state_changed.append((tid, state)),
+            circuit_breaker_opened=lambda: self.circuit_breaker_opened.append(True),
+            circuit_breaker_closed=lambda: self.circuit_breaker_closed.append(True),
+        ))
+
 @pytest.fixture
-def mock_model():
+def fake_model():
     """Fixture que proporciona un modelo simulado."""
-    model = MagicMock(spec=GenreModel)
-    model.analyze.return_value = {
-        "detected_genres": {"Rock": 0.8, "Pop": 0.6},
-        "error": None
-    }
-    model.process.return_value = {
-        "written": True,
-        "renamed": False,
-        "message": "Éxito",
-        "error": None
-    }
-    return model
+    return FakeGenreModel(
+        process_result={
+            "written": True,
+            "renamed": False,
+            "message": "Éxito",
+            "error": None
+        }
+    )
 
 @pytest.fixture
 def test_files(tmp_path):
@@ -35,23 +103,26 @@ def test_files(tmp_path):
     return files
 
 @pytest.fixture
-def processing_thread(mock_model, test_files):
+def processing_thread(fake_model, test_files):
     """Fixture que proporciona un thread de procesamiento configurado."""
     return ProcessingThread(
         file_paths=test_files,
-        model=mock_model,
-        analyze_only=True,
+        model=fake_model,
         confidence=0.3,
         max_genres=3,
         rename_files=False,
         backup_dir=None
     )
 
+@pytest.fixture
+def harness(fake_model, test_files):
+    """Fixture que proporciona un procesador de lotes sin QThread."""
+    return _Harness(test_files, fake_model)
+
 def test_thread_initialization(processing_thread, test_files):
     """Prueba la inicialización correcta del thread."""
     assert isinstance(processing_thread, QThread)
     assert processing_thread.file_paths == test_files
-    assert processing_thread.analyze_only is True
     assert processing_thread.confidence == 0.3
     assert processing_thread.max_genres == 3
     assert processing_thread.rename_files is False
@@ -62,161 +133,118 @@ def test_stop_thread(processing_thread):
     assert processing_thread.is_running is True
     processing_thread.stop()
     assert processing_thread.is_running is False
+    assert processing_thread._stop_event.is_set()
 
-def test_process_file_analyze(processing_thread, mock_model):
-    """Prueba el procesamiento en modo análisis."""
-    result = processing_thread.process_file("test.mp3")
-    assert "detected_genres" in result
-    assert result["detected_genres"]["Rock"] == 0.8
-    mock_model.analyze.assert_called_once()
-
-def test_process_file_full(mock_model):
+def test_process_file_full(fake_model):
     """Prueba el procesamiento completo de archivo."""
     thread = ProcessingThread(
         file_paths=["test.mp3"],
-        model=mock_model,
-        analyze_only=False,
+        model=fake_model,
         confidence=0.3,
         max_genres=3
     )
     result = thread.process_file("test.mp3")
     assert result["written"] is True
     assert result["message"] == "Éxito"
-    mock_model.process.assert_called_once()
+    assert fake_model.process_calls == ["test.mp3"]
 
-def test_process_file_error(processing_thread, mock_model):
+def test_process_file_error(processing_thread, fake_model):
     """Prueba manejo de errores en procesamiento."""
-    mock_model.analyze.side_effect = Exception("Test error")
+    fake_model.error = Exception("Test error")
     result = processing_thread.process_file("test.mp3")
     assert "error" in result
     assert result["error"] == "Test error"
 
-def test_run_empty_files(processing_thread):
+def test_run_empty_files(harness):
     """Prueba ejecución sin archivos."""
-    processing_thread.file_paths = []
+    harness.file_paths = []
     
-    # Capturar señales
-    progress_signals = []
-    finished_data = [None]  # Usar lista para mutabilidad
-    
-    processing_thread.progress.connect(lambda msg: progress_signals.append(msg))
-    processing_thread.finished.connect(lambda data: finished_data.__setitem__(0, data))
+    harness.run()
     
-    processing_thread.run()
-    
-    assert len(progress_signals) == 1
-    assert "No hay archivos seleccionados" in progress_signals[0]
-    assert finished_data[0] is not None
-    assert finished_data[0]["total"] == 0
+    assert len(harness.progress) == 1
+    assert "No hay archivos seleccionados" in harness.progress[0]
+    assert len(harness.finished) == 1
+    assert harness.finished[0]["total"] == 0
 
-def test_run_with_files(processing_thread, test_files):
+def test_run_with_files(harness, test_files):
     """Prueba ejecución con archivos válidos."""
-    # Capturar señales
-    progress_signals = []
-    finished_data = [None]
-    processed_files = []
-    state_changes = []
+    harness.run()
     
-    processing_thread.progress.connect(lambda msg: progress_signals.append(msg))
-    processing_thread.finished.connect(lambda data: finished_data.__setitem__(0, data))
-    processing_thread.file_processed.connect(
-        lambda fp, msg, error: processed_files.append((fp, msg, error))
-    )
-    processing_thread.task_state_changed.connect(
-        lambda tid, state: state_changes.append((tid, state))
-    )
-    
-    processing_thread.run()
-    
-    assert len(processed_files) == len(test_files)
-    assert all(not error for _, _, error in processed_files)
-    assert finished_data[0]["success"] == len(test_files)
-    assert finished_data[0]["errors"] == 0
+    assert len(harness.file_processed) == len(test_files)
+    assert all(not error for _, _, error in harness.file_processed)
+    assert harness.finished[0]["success"] == len(test_files)
+    assert harness.finished[0]["errors"] == 0
 
-def test_run_with_errors(processing_thread, test_files, mock_model):
+def test_run_with_errors(harness, test_files, fake_model):
     """Prueba ejecución con errores de procesamiento."""
-    mock_model.analyze.side_effect = Exception("Test error")
-    
-    # Capturar señales
-    processed_files = []
-    finished_data = [None]
-    
-    processing_thread.file_processed.connect(
-        lambda fp, msg, error: processed_files.append((fp, msg, error))
-    )
-    processing_thread.finished.connect(lambda data: finished_data.__setitem__(0, data))
+    fake_model.error = Exception("Test error")
     
-    processing_thread.run()
+    harness.run()
     
-    assert all(error for _, _, error in processed_files)
-    assert finished_data[0]["errors"] == len(test_files)
-    assert finished_data[0]["success"] == 0
+    assert all(error for _, _, error in harness.file_processed)
+    assert harness.finished[0]["errors"] == len(test_files)
+    assert harness.finished[0]["success"] == 0
 
-def test_circuit_breaker_integration(processing_thread, mock_model):
+def test_circuit_breaker_integration(fake_model):
     """Prueba integración con circuit breaker."""
     # Configurar el modelo para fallar consistentemente
-    mock_model.analyze.side_effect = Exception("Test error")
-    
-    # Capturar señales del circuit breaker
-    breaker_signals = {"opened": False, "closed": False}
-    
-    def on_breaker_opened():
-        breaker_signals["opened"] = True
-        
-    def on_breaker_closed():
-        breaker_signals["closed"] = True
-    
-    processing_thread.circuit_breaker_opened.connect(on_breaker_opened)
-    processing_thread.circuit_breaker_closed.connect(on_breaker_closed)
+    fake_model.error = Exception("Test error")
+    # Más archivos que hilos del pool, para que queden tareas sin despachar al abrirse
+    harness = _Harness([f"test_{i}.mp3" for i in range(12)], fake_model)
     
     # Reducir el umbral del circuit breaker para la prueba
-    processing_thread.task_queue.circuit_breaker.failure_threshold = 2
+    harness.task_queue.circuit_breaker.failure_threshold = 2
+    # Detener en la primera apertura para no esperar el backoff
+    harness.circuit_breaker_opened = MagicMock()
+    harness.circuit_breaker_opened.append.side_effect = lambda _: harness.stop()
     
-    processing_thread.run()
+    harness.run()
     
-    assert breaker_signals["opened"] is True
+    harness.circuit_breaker_opened.append.assert_called()
+
+def test_stop_reports_running_tasks(fake_model):
+    """Al detener, las tareas en curso se informan y las no iniciadas se cancelan."""
+    fake_model.delay = 0.2
+    harness = _Harness([f"test_{i}.mp3" for i in range(12)], fake_model)
+    # Detener en cuanto se despacha el primer archivo
+    harness.progress = MagicMock()
+    harness.progress.append.side_effect = lambda msg: harness.stop() if msg.startswith("Procesando") else None
+    
+    harness.run()
+    
+    # Todo archivo que llegó a procesarse se informa antes de finished
+    assert sorted(fp for fp, _, _ in harness.file_processed) == sorted(fake_model.process_calls)
+    assert len(harness.finished) == 1
+    assert harness.finished[0]["success"] == len(fake_model.process_calls)
+    # Ninguna tarea despachada queda en RUNNING
+    final_states = {}
+    for task_id, state in harness.task_state_changed:
+        final_states[task_id] = state
+    assert all(state in (TaskState.COMPLETED, TaskState.CANCELLED) for state in final_states.values())
 
-def test_renaming_integration(mock_model):
+def test_renaming_integration(fake_model):
     """Prueba integración con renombrado de archivos."""
     # Configurar el modelo para simular renombrado exitoso
-    mock_model.process.return_value = {
+    fake_model.process_result = {
         "written": True,
         "renamed": True,
         "new_filepath": "new_test.mp3",
         "message": "Archivo renombrado exitosamente"
     }
     
-    thread = ProcessingThread(
-        file_paths=["test.mp3"],
-        model=mock_model,
-        analyze_only=False,
-        rename_files=True
-    )
-    
-    # Capturar señales
-    processed_files = []
-    finished_data = [None]
-    
-    thread.file_processed.connect(
-        lambda fp, msg, error: processed_files.append((fp, msg, error))
-    )
-    thread.finished.connect(lambda data: finished_data.__setitem__(0, data))
-    
-    thread.run()
+    harness = _Harness(["test.mp3"], fake_model, rename_files=True)
+    harness.run()
     
-    assert len(processed_files) == 1
-    assert not processed_files[0][2]  # no error
-    assert "renombrado" in processed_files[0][1].lower()
-    assert finished_data[0]["renamed"] == 1
+    assert len(harness.file_processed) == 1
+    assert not harness.file_processed[0][2]  # no error
+    assert "renombrado" in harness.file_processed[0][1].lower()
+    assert harness.finished[0]["renamed"] == 1
 
 def test_backup_directory_handling(tmp_path):
     """Prueba manejo del directorio de respaldo."""
     backup_dir = str(tmp_path / "backups")
-    model = MagicMock(spec=GenreModel)
-    
-    # Simular el detector y file_handler en el modelo
-    model.detector = MagicMock()
-    model.detector.file_handler = MagicMock()
+    file_handler = FakeFileHandler()
+    model = FakeGenreModel(file_handler=file_handler)
     
     thread = ProcessingThread(
         file_paths=["test.mp3"],
@@ -225,64 +253,53 @@ def test_backup_directory_handling(tmp_path):
     )
     
     # Verificar que se configuró el backup_dir en el file_handler
-    model.detector.file_handler.set_backup_dir.assert_called_once_with(backup_dir)
+    assert file_handler.backup_dir_calls == [backup_dir]
 
-def test_concurrent_processing(processing_thread, test_files, mock_model):
+def test_concurrent_processing(harness, test_files, fake_model):
     """Prueba procesamiento concurrente de archivos."""
     # Simular procesamiento que toma tiempo
-    def slow_process(*args, **kwargs):
-        import time
-        time.sleep(0.1)
-        return {
-            "detected_genres": {"Rock": 0.8},
-            "error": None
-        }
-    
-    mock_model.analyze.side_effect = slow_process
-    
-    # Capturar orden de procesamiento
-    processed_order = []
-    processing_thread.file_processed.connect(
-        lambda fp, msg, error: processed_order.append(fp)
-    )
+    fake_model.delay = 0.1
+    fake_model.process_result = {
+        "detected_genres": {"Rock": 0.8},
+        "error": None
+    }
     
-    processing_thread.run()
+    start = time.perf_counter()
+    harness.run()
+    elapsed = time.perf_counter() - start
     
     # Verificar que todos los archivos fueron procesados
+    processed_order = [fp for fp, _, _ in harness.file_processed]
     assert set(processed_order) == set(test_files)
     assert len(processed_order) == len(test_files)
+    # Los tres archivos se procesan en paralelo, no en 3 x 100 ms
+    assert elapsed < 0.2
 
-def test_progress_reporting(processing_thread, test_files):
+def test_progress_reporting(harness, test_files):
     """Prueba reportes de progreso."""
-    progress_updates = []
-    processing_thread.progress.connect(
-        lambda msg: progress_updates.append(msg)
-    )
-    
-    processing_thread.run()
+    harness.run()
     
     # Verificar mensajes de progreso
+    progress_updates = harness.progress
     assert len(progress_updates) > len(test_files)
     assert any("Procesando" in msg for msg in progress_updates)
     assert any(f"{len(test_files)}/{len(test_files)}" in msg 
               for msg in progress_updates)
 
-def test_error_result_details(processing_thread, test_files, mock_model):
+def test_error_result_details(harness, test_files, fake_model):
     """Prueba detalles en resultados de error."""
     # Simular error específico
-    mock_model.analyze.return_value = {
+    fake_model.process_result = {
         "error": "Error de análisis",
         "detected_genres_initial_clean": {},
         "threshold_used": 0.3
     }
     
-    finished_data = [None]
-    processing_thread.finished.connect(lambda data: finished_data.__setitem__(0, data))
-    
-    processing_thread.run()
+    harness.run()
     
     # Verificar detalles del resultado
-    assert finished_data[0] is not None
+    finished_data = harness.finished
+    assert finished_data
     assert len(finished_data[0]["details"]) == len(test_files)
     for detail in finished_data[0]["details"]:
         assert "error" in detail
@@ -290,15 +307,15 @@ def test_error_result_details(processing_thread, test_files, mock_model):
         assert "threshold_used" in detail
         assert detail["threshold_used"] == 0.3
 
+@pytest.mark.slow
+@pytest.mark.skipif(not os.path.isdir(MP3_DIR) or os.environ.get("RUN_SLOW") != "1",
+                    reason="external MP3 dataset required (TEST_MP3_DIR y RUN_SLOW=1)")
 def test_real_mp3_processing():
     """Prueba procesamiento con archivos MP3 reales."""
-    # Directorio con archivos MP3 reales
-    mp3_dir = "/Volumes/My Passport/Dj compilation 2025/DMS/Mayo25/X-Mix Club Classics/X-MIX CLUB CLASSICS BEST OF 320 (Seperated Tracks)"
-    
     # Obtener lista de archivos MP3
     file_paths = [
-        os.path.join(mp3_dir, f)
-        for f in os.listdir(mp3_dir)
+        os.path.join(MP3_DIR, f)
+        for f in os.listdir(MP3_DIR)
         if f.endswith('.mp3')
     ][:3]  # Tomar solo 3 archivos para la prueba
     
@@ -311,7 +328,6 @@ def test_real_mp3_processing():
     thread = ProcessingThread(
         file_paths=file_paths,
         model=model,
-        analyze_only=True,
         confidence=0.3,
         max_genres=3,
         rename_files=False
@@ -1,69 +1,78 @@
 """Tests for token bucket rate limiter with fixed-point precision."""
-import pytest
-import time
 from src.core.rate_limiter import RateLimiter
 
-def test_basic_rate_limiting():
+def test_basic_rate_limiting(fake_clock):
     """Test basic token bucket functionality with precise checks."""
-    limiter = RateLimiter()
+    limiter = RateLimiter(clock=fake_clock)
     limiter.create_limit("test", capacity=10, fill_rate=2)  # 2 tokens/second
     
     # Initial tokens should be at capacity
-    assert limiter.get_token_count("test") == pytest.approx(10, abs=1e-6)
+    assert limiter.get_token_count("test") == 10
     
     # Use 5 tokens
     assert limiter.acquire("test", tokens=5)
-    assert limiter.get_token_count("test") == pytest.approx(5, abs=1e-6)
+    assert limiter.get_token_count("test") == 5
     
     # Use remaining 5 tokens
     assert limiter.acquire("test", tokens=5)
-    assert limiter.get_token_count("test") == pytest.approx(0, abs=1e-6)
+    assert limiter.get_token_count("test") == 0
     
     # Should not be able to get more tokens immediately
     assert not limiter.acquire("test", tokens=1, wait=False)
 
-def test_token_replenishment():
+def test_acquire_waits_for_refill(fake_clock):
+    """Test that a blocking acquire sleeps on the injected clock until tokens refill."""
+    limiter = RateLimiter(clock=fake_clock, sleep=fake_clock.sleep)
+    limiter.create_limit("test", capacity=2, fill_rate=2)  # 2 tokens/second
+    assert limiter.acquire("test", tokens=2)
+    
+    # Needs 1 token at 2 tokens/second: about half a second of (fake) waiting
+    assert limiter.acquire("test", tokens=1, wait=True)
+    assert 0.5 <= fake_clock() < 0.51
+    assert limiter.get_token_count("test") < 0.001
+
+def test_token_replenishment(fake_clock):
     """Test precise token replenishment rate."""
-    limiter = RateLimiter()
+    limiter = RateLimiter(clock=fake_clock)
     limiter.create_limit("test", capacity=10, fill_rate=2)  # 2 tokens/second
     
     # Use all tokens
     assert limiter.acquire("test", tokens=10)
-    assert limiter.get_token_count("test") == pytest.approx(0, abs=1e-6)
+    assert limiter.get_token_count("test") == 0
     
     # Wait 0.5 seconds, should have 1 new token
-    time.sleep(0.5)
-    assert limiter.get_token_count("test") == pytest.approx(1, abs=1e-5)
+    fake_clock.advance(0.5)
+    assert limiter.get_token_count("test") == 1
     
     # Wait another 0.5 seconds, should have 2 tokens
-    time.sleep(0.5)
-    assert limiter.get_token_count("test") == pytest.approx(2, abs=1e-5)
+    fake_clock.advance(0.5)
+    assert limiter.get_token_count("test") == 2
 
-def test_burst_capacity():
+def test_burst_capacity(fake_clock):
     """Test burst handling with maximum capacity and precise timing."""
-    limiter = RateLimiter()
+    limiter = RateLimiter(clock=fake_clock)
     limiter.create_limit("test", capacity=5, fill_rate=1)  # 1 token/second
     
-    assert limiter.get_token_count("test") == pytest.approx(5, abs=1e-6)
+    assert limiter.get_token_count("test") == 5
     
     # Use 3 tokens
     assert limiter.acquire("test", tokens=3)
-    assert limiter.get_token_count("test") == pytest.approx(2, abs=1e-6)
+    assert limiter.get_token_count("test") == 2
     
     # Wait 1.5 seconds, should have 3.5 tokens
-    time.sleep(1.5)
-    assert limiter.get_token_count("test") == pytest.approx(3.5, abs=1e-5)
+    fake_clock.advance(1.5)
+    assert limiter.get_token_count("test") == 3.5
     
     # Try to use 4 tokens (should fail)
     assert not limiter.acquire("test", tokens=4, wait=False)
     
     # Use 3 tokens (should succeed)
     assert limiter.acquire("test", tokens=3)
-    assert limiter.get_token_count("test") == pytest.approx(0.5, abs=1e-5)
+    assert limiter.get_token_count("test") == 0.5
 
-def test_multiple_buckets():
+def test_multiple_buckets(fake_clock):
     """Test multiple rate limiters with different configurations."""
-    limiter = RateLimiter()
+    limiter = RateLimiter(clock=fake_clock)
     limiter.create_limit("fast", capacity=10, fill_rate=10)  # 10 tokens/second
     limiter.create_limit("slow", capacity=5, fill_rate=1)    # 1 token/second
     
@@ -72,37 +81,37 @@ def test_multiple_buckets():
     assert limiter.acquire("slow", tokens=3)
     
     # Check remaining tokens
-    assert limiter.get_token_count("fast") == pytest.approx(5, abs=1e-6)
-    assert limiter.get_token_count("slow") == pytest.approx(2, abs=1e-6)
+    assert limiter.get_token_count("fast") == 5
+    assert limiter.get_token_count("slow") == 2
     
     # Different replenishment rates
-    time.sleep(0.5)
+    fake_clock.advance(0.5)
     fast_count = limiter.get_token_count("fast")
     slow_count = limiter.get_token_count("slow")
     
-    assert fast_count == pytest.approx(10, abs=1e-5)  # Should be full (10 * 0.5 = 5 new tokens)
-    assert slow_count == pytest.approx(2.5, abs=1e-5)  # Should have gained 0.5
+    assert fast_count == 10  # Should be full (10 * 0.5 = 5 new tokens)
+    assert slow_count == 2.5  # Should have gained 0.5
 
-def test_boundary_conditions():
+def test_boundary_conditions(fake_clock):
     """Test boundary conditions and edge cases."""
-    limiter = RateLimiter()
+    limiter = RateLimiter(clock=fake_clock)
     limiter.create_limit("test", capacity=1.5, fill_rate=1)  # Small capacity
     
     # Verify initial state
-    assert limiter.get_token_count("test") == pytest.approx(1.5, abs=1e-6)
+    assert limiter.get_token_count("test") == 1.5
     
     # Test fractional token acquisition
     assert limiter.acquire("test", tokens=0.3)
-    assert limiter.get_token_count("test") == pytest.approx(1.2, abs=1e-6)
+    assert limiter.get_token_count("test") == 1.2
     
     # Test very small token request
     assert limiter.acquire("test", tokens=0.0001)
-    assert limiter.get_token_count("test") == pytest.approx(1.1999, abs=1e-6)
+    assert limiter.get_token_count("test") == 1.1999
     
     # Test exact capacity token request
     limiter.create_limit("exact", capacity=2, fill_rate=1)
     assert limiter.acquire("exact", tokens=2)
-    assert limiter.get_token_count("exact") == pytest.approx(0, abs=1e-6)
+    assert limiter.get_token_count("exact") == 0
 
 def test_nonexistent_bucket():
     """Test behavior with nonexistent bucket."""
@@ -112,15 +121,28 @@ def test_nonexistent_bucket():
     assert limiter.acquire("nonexistent")
     assert limiter.get_token_count("nonexistent") is None
 
-def test_high_precision_timing():
+def test_high_precision_timing(fake_clock):
     """Test precise timing and token accumulation."""
-    limiter = RateLimiter()
+    limiter = RateLimiter(clock=fake_clock)
     limiter.create_limit("precise", capacity=10, fill_rate=0.1)  # 0.1 tokens/second
     
     # Use 1 token
     assert limiter.acquire("precise", tokens=1)
-    assert limiter.get_token_count("precise") == pytest.approx(9, abs=1e-6)
+    assert limiter.get_token_count("precise") == 9
     
     # Wait 0.15 seconds - should accumulate 0.015 tokens
-    time.sleep(0.15)
-    assert limiter.get_token_count("precise") == pytest.approx(9.015, abs=1e-5)
\ No newline at end of file
+    fake_clock.advance(0.15)
+    assert limiter.get_token_count("precise") == 9.015
+
+def test_fractional_refill_is_not_lost(fake_clock):
+    """Test that sub-token refills accumulate across many small updates."""
+    limiter = RateLimiter(clock=fake_clock)
+    limiter.create_limit("carry", capacity=1, fill_rate=0.3)  # 0.3 tokens/second
+    assert limiter.acquire("carry", tokens=1)
+    
+    # Each 1µs step adds only 0.3 micro-tokens; the remainder must carry over
+    for _ in range(10):
+        fake_clock.advance(0.000001)
+        limiter.get_token_count("carry")
+    
+    assert limiter.get_token_count("carry") == 0.000003
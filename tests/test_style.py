@@ -2,15 +2,15 @@
 import pytest
 from PySide6.QtWidgets import QWidget, QPushButton, QCheckBox, QLabel
 from PySide6.QtGui import QPalette, QColor
-from src.gui.style import ColorScheme, ThemeType, ThemeManager
+from src.gui.style import ColorScheme, ThemeType, ThemeManager, apply_light_theme, apply_dark_theme
 
 @pytest.fixture
-def test_widget():
+def test_widget(qapp):
     """Fixture que proporciona un widget de prueba."""
     return QWidget()
 
 @pytest.fixture
-def test_button():
+def test_button(qapp):
     """Fixture que proporciona un botón de prueba."""
     return QPushButton("Test")
 
@@ -31,7 +31,7 @@ def color_scheme():
         border=QColor("#CCCCCC")
     )
 
-def test_color_scheme_initialization():
+def test_color_scheme_initialization(qapp):
     """Prueba la inicialización del esquema de colores."""
     scheme = ColorScheme(
         primary=QColor("#FF0000"),
@@ -61,27 +61,27 @@ def test_theme_type_values():
     assert ThemeType.DARK.value == "dark"
     assert len(ThemeType) == 2
 
-def test_theme_manager_light_scheme():
-    """Prueba el esquema de color claro predefinido."""
-    scheme = ThemeManager.LIGHT_SCHEME
-    assert scheme.background.name() == "#ffffff"
-    assert scheme.surface.name() == "#f5f5f5"
-    assert scheme.primary.name() == "#2196f3"
-
-def test_theme_manager_dark_scheme():
-    """Prueba el esquema de color oscuro predefinido."""
-    scheme = ThemeManager.DARK_SCHEME
-    assert scheme.background.name() == "#0d1b2a"
-    assert scheme.surface.name() == "#1b263b"
+@pytest.mark.parametrize("scheme, background, surface", [
+    (ThemeManager.LIGHT_SCHEME, "#ffffff", "#f5f5f5"),
+    (ThemeManager.DARK_SCHEME, "#0d1b2a", "#1b263b"),
+], ids=["light", "dark"])
+def test_theme_manager_scheme(scheme, background, surface):
+    """Prueba los esquemas de color predefinidos."""
+    assert scheme.background.name() == background
+    assert scheme.surface.name() == surface
     assert scheme.primary.name() == "#2196f3"
 
-def test_apply_theme_to_widget(test_widget):
+@pytest.mark.parametrize("theme, scheme", [
+    (ThemeType.LIGHT, ThemeManager.LIGHT_SCHEME),
+    (ThemeType.DARK, ThemeManager.DARK_SCHEME),
+], ids=["light", "dark"])
+def test_apply_theme_to_widget(test_widget, theme, scheme):
     """Prueba la aplicación de un tema a un widget."""
-    ThemeManager.apply_theme(test_widget, ThemeType.LIGHT)
+    ThemeManager.apply_theme(test_widget, theme)
     palette = test_widget.palette()
     
-    assert palette.color(QPalette.Window).name() == ThemeManager.LIGHT_SCHEME.background.name()
-    assert palette.color(QPalette.WindowText).name() == ThemeManager.LIGHT_SCHEME.on_background.name()
+    assert palette.color(QPalette.Window).name() == scheme.background.name()
+    assert palette.color(QPalette.WindowText).name() == scheme.on_background.name()
 
 def test_apply_theme_to_button(test_button):
     """Prueba la aplicación de un tema a un botón."""
@@ -115,7 +115,7 @@ def test_theme_switching(test_widget):
     assert light_background != dark_background
     assert dark_background == ThemeManager.DARK_SCHEME.background.name()
 
-def test_widget_specific_styles():
+def test_widget_specific_styles(qapp):
     """Prueba estilos específicos por tipo de widget."""
     # Probar CheckBox
     checkbox = QCheckBox("Test")
@@ -167,16 +167,12 @@ def test_stylesheet_components(test_widget):
     for component in components:
         assert component in stylesheet
 
-def test_compatibility_functions(test_widget):
+@pytest.mark.parametrize("apply_func, scheme", [
+    (apply_light_theme, ThemeManager.LIGHT_SCHEME),
+    (apply_dark_theme, ThemeManager.DARK_SCHEME),
+], ids=["light", "dark"])
+def test_compatibility_functions(test_widget, apply_func, scheme):
     """Prueba funciones de compatibilidad."""
-    from src.gui.style import apply_light_theme, apply_dark_theme
-    
-    # Probar tema claro
-    apply_light_theme(test_widget)
-    light_background = test_widget.palette().color(QPalette.Window).name()
-    assert light_background == ThemeManager.LIGHT_SCHEME.background.name()
-    
-    # Probar tema oscuro
-    apply_dark_theme(test_widget)
-    dark_background = test_widget.palette().color(QPalette.Window).name()
-    assert dark_background == ThemeManager.DARK_SCHEME.background.name()
\ No newline at end of file
+    apply_func(test_widget)
+    background = test_widget.palette().color(QPalette.Window).name()
+    assert background == scheme.background.name()
\ No newline at end of file
@@ -1,8 +1,7 @@
 """Pruebas unitarias para el sistema de cola de tareas."""
+import heapq
 import pytest
 import time
-from concurrent.futures import ThreadPoolExecutor
-from queue import Queue
 from src.gui.threads.task_queue import TaskQueue, Task, TaskState, CircuitBreaker
 
 def test_task():
@@ -66,6 +65,17 @@ def test_complete_task(task_queue):
     assert task2.state == TaskState.FAILED
     assert task2.error == "error message"
 
+def test_snapshot_states(task_queue):
+    """Prueba obtener los estados de todas las tareas en una sola llamada."""
+    def test_func(): 
+        pass
+    
+    task1 = task_queue.add_task("task1", test_func)
+    task_queue.add_task("task2", test_func)
+    task_queue.complete_task(task1, result="ok")
+    
+    assert task_queue.snapshot_states() == [TaskState.COMPLETED, TaskState.PENDING]
+
 def test_cancel_task(task_queue):
     """Prueba cancelar una tarea."""
     def test_func(): 
@@ -133,7 +143,7 @@ def test_task_queue_with_circuit_breaker(task_queue):
     task_queue.complete_task(task2, error="error2")
     assert task_queue.get_next_task() is None  # Circuito abierto
 
-def test_concurrent_task_processing(task_queue):
+def test_concurrent_task_processing(task_queue, executor):
     """Prueba procesamiento concurrente de tareas."""
     def worker_func(task_id):
         def test_func():
@@ -146,9 +156,8 @@ def test_concurrent_task_processing(task_queue):
         return task.id, task.result
     
     # Procesar tareas concurrentemente
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(worker_func, i) for i in range(10)]
-        results = [future.result() for future in futures]
+    futures = [executor.submit(worker_func, i) for i in range(10)]
+    results = [future.result() for future in futures]
     
     # Verificar resultados
     for task_id, result in results:
@@ -171,7 +180,7 @@ def test_error_handling(task_queue):
     assert task.state == TaskState.FAILED
     assert task.error == "Test error"
 
-def test_queue_stress(task_queue):
+def test_queue_stress(task_queue, executor):
     """Prueba de estrés para la cola de tareas."""
     def slow_task(task_id, sleep_time):
         time.sleep(sleep_time)
@@ -189,9 +198,8 @@ def test_queue_stress(task_queue):
         result = task.func(*task.args)
         task_queue.complete_task(task, result=result)
     
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(process_task, task) for task in tasks]
-        [future.result() for future in futures]
+    futures = [executor.submit(process_task, task) for task in tasks]
+    [future.result() for future in futures]
     
     # Verificar resultados
     completed_count = sum(1 for task in tasks if task.state == TaskState.COMPLETED)
@@ -199,8 +207,8 @@ def test_queue_stress(task_queue):
 
 def test_task_priorities():
     """Prueba manejo de prioridades en tareas."""
-    # Crear cola con prioridades
-    pq = Queue()
+    # Montículo local: la prueba no comparte la cola entre hilos
+    pq = []
     
     def priority_task(priority):
         return priority
@@ -210,12 +218,12 @@ def test_task_priorities():
     for i in range(5):
         task = Task(f"task_{i}", priority_task, (i,), {})
         tasks.append(task)
-        pq.put((i, task))  # Tupla (prioridad, tarea)
+        heapq.heappush(pq, (i, id(task), task))  # id(task) desempata sin comparar Task
     
     # Verificar orden de extracción
     extracted_tasks = []
-    while not pq.empty():
-        priority, task = pq.get()
+    while pq:
+        priority, _, task = heapq.heappop(pq)
         extracted_tasks.append(task)
     
     # Las tareas deberían estar en orden de prioridad
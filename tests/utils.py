@@ -1,27 +1,20 @@
 """Test utilities and helper functions."""
 import os
-import base64
+from functools import lru_cache
+from pathlib import Path
 
+@lru_cache(maxsize=1)
 def get_minimal_mp3_data():
     """Get a minimal valid MP3 file data for testing.
     
-    This is a base64-encoded minimal MP3 file with:
+    The file lives in tests/resources/minimal.mp3 and has:
     - Valid ID3v2 header
     - Valid MPEG frame header
     - Minimal audio data
+    
+    It is read once and the bytes are reused for the whole session.
     """
-    # This is a base64 encoded minimal valid MP3 file (44.1kHz, 128kbps, stereo)
-    minimal_mp3 = """
-    SUQzBAAAAAAAI1RTU0UAAAAPAAADTGF2ZjU4Ljc2LjEwMAAAAAAAAAAAAAAA//tQAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
-    AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA=
-    """
-    return base64.b64decode(minimal_mp3.strip())
+    return (Path(__file__).parent / "resources" / "minimal.mp3").read_bytes()
 
 def create_minimal_mp3(path):
     """Create a minimal valid MP3 file at the given path.
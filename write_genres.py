@@ -1,61 +1,137 @@
 """Write detected genres back to MP3 files."""
+import argparse
+import heapq
+import logging
 import os
 import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from src.core.file_handler import Mp3FileHandler
 
-def write_genres(analysis_file: str, confidence_threshold: float = 0.3, max_genres: int = 3):
+try:
+    import ijson
+except ImportError:  # ijson es opcional; sin él el análisis se carga completo con json
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; acelera la carga completa cuando no hay ijson
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _process_one(filepath: str, analysis: Dict, handler: Mp3FileHandler,
+                 confidence_threshold: float, max_genres: int) -> Tuple[List[str], Optional[bool]]:
+    """Select and write the genres of a single file.
+
+    Args:
+        filepath: Path to the MP3 file
+        analysis: Analysis result for the file
+        handler: File handler used to write the tags
+        confidence_threshold: Minimum confidence to include genre
+        max_genres: Maximum number of genres to write
+
+    Returns:
+        Tuple of (selected genres, write result); the result is None when
+        no genre met the threshold and nothing was written
+    """
+    genres = analysis.get("detected_genres", {})
+    if max_genres == 1:
+        # Caso habitual: basta con el género más confiable
+        genre, confidence = max(genres.items(), key=itemgetter(1), default=(None, 0))
+        selected_genres = [genre] if genre is not None and confidence >= confidence_threshold else []
+    else:
+        # Get the max_genres most confident genres without sorting all of them
+        top = heapq.nlargest(max_genres, genres.items(), key=itemgetter(1))
+        selected_genres = [genre for genre, confidence in top if confidence >= confidence_threshold]
+
+    if not selected_genres:
+        return selected_genres, None
+
+    return selected_genres, handler.write_genre(filepath, selected_genres)
+
+def _iter_analysis(f) -> Iterable[Tuple[str, Dict]]:
+    """Yield (filepath, analysis) pairs from an analysis JSON file.
+
+    With ijson the pairs are parsed as the file is read, so memory does not
+    grow with the size of the library. Otherwise the whole file is parsed
+    at once, with orjson when it is installed.
+
+    Args:
+        f: Analysis file opened in binary mode
+
+    Returns:
+        Iterable of (filepath, analysis) pairs
+    """
+    if ijson is not None:
+        return ijson.kvitems(f, "", use_float=True)
+    if orjson is not None:
+        return orjson.loads(f.read()).items()
+    return json.load(f).items()
+
+def _report(filepath: str, future: Future) -> None:
+    """Log the outcome of a single file."""
+    selected_genres, success = future.result()
+    logger.info("Processing: %s", os.path.basename(filepath))
+
+    if not selected_genres:
+        logger.info("No genres met confidence threshold")
+        return
+
+    logger.info("Writing genres: %s", selected_genres)
+    if success:
+        logger.info("Successfully updated file")
+    else:
+        logger.warning("Failed to update file: %s", filepath)
+
+def write_genres(analysis_file: str, confidence_threshold: float = 0.3, max_genres: int = 3,
+                 max_workers: Optional[int] = None):
     """Write detected genres to MP3 files.
-    
+
     Args:
         analysis_file: Path to JSON analysis results
         confidence_threshold: Minimum confidence to include genre
         max_genres: Maximum number of genres to write
+        max_workers: Number of files written in parallel (default: CPU count)
     """
-    print(f"\nLoading analysis from: {analysis_file}")
-    with open(analysis_file) as f:
-        results = json.load(f)
-        
+    logger.info("Loading analysis from: %s", analysis_file)
+
     # Create file handler with backup directory
     backup_dir = "/Volumes/My Passport/Dj compilation 2025/Respados mp3"
     handler = Mp3FileHandler(backup_dir)
-    
-    print(f"\nProcessing {len(results)} files...")
-    print(f"Using confidence threshold: {confidence_threshold}")
-    print(f"Maximum genres per file: {max_genres}")
-    
-    for filepath, analysis in results.items():
-        print(f"\nProcessing: {os.path.basename(filepath)}")
-        
-        # Get detected genres sorted by confidence
-        genres = analysis.get("detected_genres", {})
-        selected_genres = []
-        
-        for genre, confidence in sorted(
-            genres.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        ):
-            if confidence >= confidence_threshold:
-                selected_genres.append(genre)
-                if len(selected_genres) >= max_genres:
-                    break
-                    
-        if not selected_genres:
-            print("No genres met confidence threshold")
-            continue
-            
-        print(f"Writing genres: {selected_genres}")
-        success = handler.write_genre(filepath, selected_genres)
-        
-        if success:
-            print("Successfully updated file")
-        else:
-            print("Failed to update file")
-            
-    print("\nFinished processing files")
+
+    logger.info("Using confidence threshold: %s", confidence_threshold)
+    logger.info("Maximum genres per file: %s", max_genres)
+
+    # Cada archivo es independiente: se escriben en paralelo mientras se sigue
+    # leyendo el análisis. Solo se mantiene una ventana acotada de archivos en
+    # curso y los resultados se registran desde este hilo, en el orden original
+    workers = max_workers or os.cpu_count() or 1
+    pending = deque()
+    processed = 0
+    with open(analysis_file, "rb") as f, ThreadPoolExecutor(max_workers=workers) as executor:
+        for filepath, analysis in _iter_analysis(f):
+            pending.append((filepath, executor.submit(
+                _process_one, filepath, analysis, handler, confidence_threshold, max_genres
+            )))
+            if len(pending) >= workers * 2:
+                _report(*pending.popleft())
+            processed += 1
+        while pending:
+            _report(*pending.popleft())
+
+    logger.info("Finished processing %d files", processed)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write detected genres back to MP3 files")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show progress messages")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(message)s")
+
     write_genres(
         "analysis_results.json",
         confidence_threshold=0.3,
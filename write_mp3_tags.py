@@ -2,13 +2,48 @@
 """Write ID3 tags to an MP3 file."""
 import os
 import sys
+import errno
+import logging
 import shutil
 import argparse
-from mutagen.id3 import ID3, TXXX
-from mutagen.easyid3 import EasyID3, error as EasyID3Error
+from functools import partial
+from mutagen.id3 import (
+    COMM, ID3, ID3NoHeaderError, ID3v1SaveOptions, TALB, TCOM, TCON, TDRC, TIT2, TPE1, TPE2,
+    TPOS, TRCK, TXXX,
+)
+from mutagen.easyid3 import EasyID3
 
-def parse_args():
-    """Parse command line arguments."""
+try:
+    import fcntl
+except ImportError:  # fcntl no existe en Windows; allí no hay reflink
+    fcntl = None
+
+# ioctl FICLONE de linux/fs.h: clona el archivo compartiendo bloques (btrfs, XFS)
+FICLONE = 0x40049409
+
+logger = logging.getLogger(__name__)
+
+# Frame de cada tag que escribe el CLI; se construyen directamente sin pasar por EasyID3
+_FRAME_MAP = {
+    'artist': TPE1,
+    'title': TIT2,
+    'album': TALB,
+    'date': TDRC,
+    'year': TDRC,
+    'genre': TCON,
+    'composer': TCOM,
+    'performer': partial(TXXX, desc='PERFORMER'),  # igual que EasyID3
+    'albumartist': TPE2,
+    'tracknumber': TRCK,
+    'discnumber': TPOS,
+    'comment': partial(COMM, lang='eng', desc=''),
+}
+
+# Claves que acepta EasyID3, calculadas una vez en lugar de por cada tag
+_VALID_EASYID3 = frozenset(EasyID3.valid_keys)
+
+def _build_parser():
+    """Build the command line parser."""
     parser = argparse.ArgumentParser(description="Write ID3 tags to an MP3 file")
     
     parser.add_argument(
@@ -88,28 +123,118 @@ def parse_args():
         help="Create a backup of the original file"
     )
     
+    parser.add_argument(
+        "--backup-mode",
+        choices=["auto", "reflink", "copy"],
+        default="auto",
+        help="How the backup is made (auto: copy-on-write reflink when the filesystem "
+             "supports it, else a regular copy; reflink: fail without reflink; copy: always "
+             "copy). Hardlinks are not offered: tags are rewritten in place, which would "
+             "also change a hardlinked backup"
+    )
+    
     parser.add_argument(
         "--remove-all",
         action="store_true",
         help="Remove all existing tags before adding new ones"
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Show progress messages"
+    )
+    
+    return parser
+
+# El parser se construye una sola vez, al importar el módulo
+_PARSER = _build_parser()
+
+def parse_args(argv=None):
+    """Parse command line arguments.
+    
+    Args:
+        argv: Arguments to parse (default: sys.argv[1:])
+    """
+    return _PARSER.parse_args(argv)
+
+def reflink_file(src, dst):
+    """Clone a file with the FICLONE ioctl.
+    
+    The clone shares the data blocks of the source until either file is
+    modified, so it takes constant time and no extra space.
+    
+    Args:
+        src: Path to the source file
+        dst: Path to the clone
+        
+    Raises:
+        OSError: If the platform or filesystem does not support reflinks
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform")
+    # Clonar a un temporal para no perder un backup anterior si el clon falla
+    tmp_path = f"{dst}.tmp"
+    try:
+        with open(src, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, dst)
 
-def create_backup(file_path):
+def create_backup(file_path, mode="auto"):
     """Create a backup of the file.
     
+    The backup must not share its data with the original: mutagen rewrites
+    the tag in place, so a hardlinked backup would change along with it.
+    
     Args:
         file_path: Path to the file to back up
+        mode: "auto" to try a reflink and fall back to a copy, "reflink"
+            to require a reflink, "copy" to always copy
         
     Returns:
         Path to the backup file
+        
+    Raises:
+        OSError: If mode is "reflink" and the reflink fails
     """
     backup_path = f"{file_path}.bak"
-    shutil.copy2(file_path, backup_path)
-    print(f"Backup created: {backup_path}")
+    cloned = False
+    if mode != "copy":
+        try:
+            reflink_file(file_path, backup_path)
+            cloned = True
+        except OSError:
+            if mode == "reflink":
+                raise
+    if not cloned:
+        # copyfile ya usa sendfile/fcopyfile en el kernel cuando puede
+        shutil.copyfile(file_path, backup_path)
+    shutil.copystat(file_path, backup_path)
+    logger.info("Backup created: %s%s", backup_path, " (reflink)" if cloned else "")
     return backup_path
 
+def _keep_padding(info):
+    """Padding for ID3.save that reuses the space already in the file.
+    
+    mutagen's default shrinks a large padding, which rewrites the whole
+    file. Keeping it means the new tag overwrites the old one in place
+    whenever it fits; only a tag that outgrows it moves the audio data,
+    and then the default headroom is reserved for the next write.
+    
+    Args:
+        info: mutagen PaddingInfo for the new tag
+        
+    Returns:
+        Padding in bytes
+    """
+    if info.padding >= 0:
+        return info.padding
+    return info.get_default_padding()
+
 def write_tags(file_path, tags_dict, remove_all=False):
     """Write tags to an MP3 file.
     
@@ -119,62 +244,80 @@ def write_tags(file_path, tags_dict, remove_all=False):
         remove_all: Whether to remove all existing tags before writing
     """
     try:
-        # Initialize EasyID3
+        # Load the tags once; every change is made in memory and saved once
         try:
-            if remove_all:
-                # Delete existing ID3 tag completely
-                id3 = ID3(file_path)
-                id3.delete()
-                print("Removed all existing tags")
-            
-            # Create/load the tags
-            audio = EasyID3(file_path)
-        except EasyID3Error:
+            id3 = ID3(file_path)
+        except ID3NoHeaderError:
             # If no existing tags, create them
-            audio = EasyID3()
-            audio.save(file_path)
+            id3 = ID3()
         
-        # Write standard tags
-        for key, value in tags_dict.items():
-            if value and key in audio.valid_keys.keys():
-                if isinstance(value, list):
-                    audio[key] = value
-                else:
-                    audio[key] = [value]
+        if remove_all:
+            # Drop every existing frame; the ID3v1 tag is removed on save
+            id3.clear()
+            logger.info("Removed all existing tags")
         
-        # Save changes
-        audio.save(file_path)
+        # Solo se reescribe el archivo si algo cambió
+        dirty = remove_all
+        
+        # Write standard tags and collect custom ones ("custom:<desc>") in one pass
+        custom_tags = {}
+        for key, value in tags_dict.items():
+            prefix, sep, desc = key.partition(':')
+            if sep and prefix == 'custom':
+                custom_tags[desc] = value
+            elif value and key in _FRAME_MAP:
+                id3.add(_FRAME_MAP[key](encoding=3, text=value if isinstance(value, list) else [value]))
+                dirty = True
+            elif value and key in _VALID_EASYID3:
+                # Resto de claves de EasyID3: su setter, aplicado directamente sobre el ID3
+                EasyID3.Set[key](id3, key, value if isinstance(value, list) else [value])
+                dirty = True
         
         # Handle custom tags which EasyID3 doesn't support
-        custom_tags = {k: v for k, v in tags_dict.items() if k.startswith('custom:')}
-        if custom_tags:
-            id3 = ID3(file_path)
-            for key, value in custom_tags.items():
-                desc = key.split(':', 1)[1]
-                txxx = TXXX(encoding=3, desc=desc, text=value)
-                id3.add(txxx)
-            id3.save(file_path)
+        for desc, value in custom_tags.items():
+            txxx = TXXX(encoding=3, desc=desc, text=value)
+            id3.add(txxx)
+            dirty = True
+        
+        if not dirty:
+            logger.info("No valid tags to write; file left unchanged")
+            return True
         
-        print("Tags updated successfully")
+        # Save changes
+        id3.save(file_path, v1=ID3v1SaveOptions.REMOVE if remove_all else ID3v1SaveOptions.UPDATE,
+                 padding=_keep_padding)
+        
+        logger.info("Tags updated successfully")
     
     except Exception as e:
-        print(f"Error writing tags: {e}")
+        logger.error("Error writing tags: %s", e)
         return False
     
     return True
 
-def main():
-    """Main entry point."""
-    args = parse_args()
+def main(argv=None):
+    """Main entry point.
+    
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+    """
+    args = parse_args(argv)
+    logging.basicConfig(format="%(message)s")
+    # basicConfig solo actúa en la primera llamada; el nivel se fija en cada una
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
     
     # Validate file
     if not os.path.exists(args.file_path):
-        print(f"Error: File not found: {args.file_path}")
+        logger.error("Error: File not found: %s", args.file_path)
         return 1
     
     # Create backup if requested
     if args.backup:
-        create_backup(args.file_path)
+        try:
+            create_backup(args.file_path, args.backup_mode)
+        except OSError as e:
+            logger.error("Error creating backup: %s", e)
+            return 1
     
     # Parse custom tags
     custom_tags = {}
@@ -184,7 +327,7 @@ def main():
                 key, value = custom.split('=', 1)
                 custom_tags[f"custom:{key}"] = value
             else:
-                print(f"Warning: Ignoring malformed custom tag: {custom}")
+                logger.warning("Warning: Ignoring malformed custom tag: %s", custom)
     
     # Prepare tags dictionary
     tags = {
@@ -201,8 +344,9 @@ def main():
         'comment': args.comment
     }
     
-    # Add year if specifically provided (some players prefer 'date', others 'year')
-    if args.year:
+    # Add year if specifically provided (some players prefer 'date', others 'year').
+    # Both are stored in TDRC, so a full --date takes precedence
+    if args.year and not args.date:
         tags['year'] = args.year
     
     # Add custom tags
@@ -212,7 +356,7 @@ def main():
     tags = {k: v for k, v in tags.items() if v is not None}
     
     if not tags:
-        print("Error: No tags specified")
+        logger.error("Error: No tags specified")
         return 1
     
     # Write tags